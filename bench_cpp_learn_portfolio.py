@@ -0,0 +1,248 @@
+# =====================================================================
+# Benchmark für cpp_learn_portfolio.py
+#
+# Erzeugt synthetische cpp_mastery/steps Bäume in einem Temp-Ordner und
+# misst die wichtigsten Pfade des Automators:
+#
+#    • bulk_init     → N Steps per init_step() anlegen
+#    • cold_update   → update_all() ohne Thumbnails/Manifest
+#    • warm_update   → update_all() direkt danach (nichts geändert)
+#    • single_change → ein neuer Screenshot in einem Step, dann update_all()
+#    • init_startup  → "py cpp_learn_portfolio.py startup probe" als eigener Prozess;
+#                      prüft per -X importtime, dass dabei kein PIL geladen wird
+#
+# Pro Szenario: Wandzeit, "Syscall"-Zähler (os.stat, os.scandir,
+# os.listdir, open, os.replace im Hauptprozess) und Peak-RSS.
+# Ausgabe als JSON, damit Läufe über Commits vergleichbar sind.
+#
+# VERWENDUNG:
+#      py bench_cpp_learn_portfolio.py
+#      py bench_cpp_learn_portfolio.py --steps 10,100,1000 --shots 0-500
+#      py bench_cpp_learn_portfolio.py --jobs 4 --seed 1 --out bench.json
+#
+#    --steps   Liste von Baumgrößen (Anzahl Steps), Standard 10,100
+#    --shots   Screenshots pro Step als min-max, Standard 0-20
+#    --jobs    an update_all() durchgereicht (Standard: CPU-Kerne)
+#    --seed    Zufalls-Seed für reproduzierbare Bäume
+#    --out     JSON zusätzlich in Datei schreiben
+#
+# =====================================================================
+
+import os
+import sys
+import io
+import json
+import time
+import random
+import shutil
+import builtins
+import tempfile
+import subprocess
+import contextlib
+from datetime import datetime
+
+import cpp_learn_portfolio as portfolio
+
+# Bildvorlagen: (Format, Breite, Höhe) – gemischte PNG/JPEG-Größen
+IMAGE_TEMPLATES = [
+    ("png", 800, 600),
+    ("png", 1920, 1080),
+    ("jpg", 1280, 720),
+    ("jpg", 3840, 2160),
+]
+
+COUNTED_CALLS = [
+    (os, "stat"),
+    (os, "scandir"),
+    (os, "listdir"),
+    (os, "replace"),
+    (builtins, "open"),
+]
+
+# =====================================================================
+# Messhilfen
+# =====================================================================
+
+@contextlib.contextmanager
+def count_calls():
+    """Zählt Aufrufe der Dateisystem-Funktionen aus COUNTED_CALLS"""
+    counts = {f"{module.__name__}.{name}": 0 for module, name in COUNTED_CALLS}
+    originals = []
+
+    for module, name in COUNTED_CALLS:
+        original = getattr(module, name)
+        key = f"{module.__name__}.{name}"
+
+        def wrapper(*args, _original=original, _key=key, **kwargs):
+            counts[_key] += 1
+            return _original(*args, **kwargs)
+
+        originals.append((module, name, original))
+        setattr(module, name, wrapper)
+    try:
+        yield counts
+    finally:
+        for module, name, original in originals:
+            setattr(module, name, original)
+
+def peak_rss_kb():
+    """Peak-RSS von Prozess + Kindern in KB (None ohne resource-Modul)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    scale = 1 if sys.platform.startswith("linux") else 1 / 1024  # macOS: Bytes
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return int(own * scale), int(children * scale)
+
+def measure(name, func):
+    """Führt func still aus und liefert das Messergebnis als Dict"""
+    with count_calls() as counts, contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func()
+        wall = time.perf_counter() - start
+    portfolio.flush_log()
+    rss = peak_rss_kb()
+    return {
+        "scenario": name,
+        "wall_s": round(wall, 4),
+        "calls": counts,
+        "peak_rss_kb": rss[0] if rss else None,
+        "peak_rss_children_kb": rss[1] if rss else None,
+    }
+
+# =====================================================================
+# Synthetischer Baum
+# =====================================================================
+
+def make_templates(template_dir):
+    """Erzeugt die Bildvorlagen einmal; Screenshots sind Kopien davon"""
+    from PIL import Image
+    paths = []
+    for i, (fmt, width, height) in enumerate(IMAGE_TEMPLATES):
+        path = os.path.join(template_dir, f"template_{i}.{fmt}")
+        img = Image.new("RGB", (width, height), (40 * i, 120, 200))
+        if fmt == "jpg":
+            img.save(path, quality=85)
+        else:
+            img.save(path)
+        paths.append(path)
+    return paths
+
+def fill_screenshots(rng, templates, shots_min, shots_max):
+    """Kopiert zufällig viele Vorlagen in jedes screenshots/ mit gestaffelten mtimes"""
+    total = 0
+    base = time.time() - 86400
+    for step in portfolio.scan_steps():
+        screenshots = os.path.join(step["path"], "screenshots")
+        for i in range(rng.randint(shots_min, shots_max)):
+            template = rng.choice(templates)
+            target = os.path.join(screenshots, f"shot_{i:04d}{os.path.splitext(template)[1]}")
+            shutil.copyfile(template, target)
+            os.utime(target, (base + total, base + total))
+            total += 1
+    return total
+
+def bulk_init(count):
+    """Legt count Steps an wie count einzelne CLI-Aufrufe"""
+    for i in range(count):
+        portfolio.init_step(portfolio.get_next_step_number(), f"bench step {i}")
+
+def add_one_screenshot(templates):
+    """Legt im ersten Step einen zusätzlichen Screenshot an"""
+    step = portfolio.scan_steps()[0]
+    shutil.copyfile(templates[0], os.path.join(step["path"], "screenshots", "zz_new.png"))
+
+def run_size(steps, shots_min, shots_max, jobs, seed):
+    """Alle Szenarien für eine Baumgröße in einem frischen Temp-Ordner"""
+    rng = random.Random(seed)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="cpp_learn_bench_") as tmp:
+        scripts = os.path.join(tmp, "scripts")
+        os.makedirs(scripts)
+        portfolio.ROOT_DIR = os.path.join(tmp, "cpp_mastery")
+        portfolio.STEPS_DIR = os.path.join(portfolio.ROOT_DIR, "steps")
+        os.makedirs(portfolio.ROOT_DIR)
+
+        old_cwd = os.getcwd()
+        os.chdir(scripts)   # update_log.txt landet im Temp-Ordner
+        try:
+            templates = make_templates(tmp)
+            results.append(measure("bulk_init", lambda: bulk_init(steps)))
+            screenshots = fill_screenshots(rng, templates, shots_min, shots_max)
+            results.append(measure("cold_update", lambda: portfolio.update_all(jobs=jobs)))
+            results.append(measure("warm_update", lambda: portfolio.update_all(jobs=jobs)))
+            add_one_screenshot(templates)
+            results.append(measure("single_change", lambda: portfolio.update_all(jobs=jobs)))
+            results.append(measure_init_startup(portfolio.ROOT_DIR))
+        finally:
+            os.chdir(old_cwd)
+
+    for result in results:
+        result["steps"] = steps
+        result["screenshots"] = screenshots
+    return results
+
+def measure_init_startup(root_dir):
+    """Startet einen echten Init-Aufruf und prüft die importierten Module"""
+    script = os.path.abspath(portfolio.__file__)
+    scripts = os.path.join(os.path.dirname(root_dir), "scripts")
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-X", "importtime", script, "startup probe"],
+                         cwd=scripts, capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - start
+    imported = [line.rsplit("|", 1)[-1].strip() for line in out.stderr.splitlines() if "|" in line]
+    return {
+        "scenario": "init_startup",
+        "wall_s": round(wall, 4),
+        "exit_code": out.returncode,
+        "modules_imported": len(imported),
+        "pil_imported": any(name == "PIL" or name.startswith("PIL.") for name in imported),
+        "json_imported": "json" in imported,
+    }
+
+def git_revision():
+    """Aktueller Commit des Scripts (falls in einem Git-Repo)"""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+# =====================================================================
+# MAIN
+# =====================================================================
+
+if __name__ == "__main__":
+    options, _ = portfolio.split_options(sys.argv[1:], value_options={"steps", "shots", "jobs", "seed", "out"})
+
+    if not portfolio.pil_installed():
+        print("❌ Benchmark braucht Pillow (pip install Pillow)")
+        sys.exit(1)
+
+    sizes = [int(n) for n in str(options.get("steps", "10,100")).split(",")]
+    shots_min, _, shots_max = str(options.get("shots", "0-20")).partition("-")
+    shots_min = int(shots_min)
+    shots_max = int(shots_max or shots_min)
+    jobs = int(options["jobs"]) if "jobs" in options else None
+    seed = int(options.get("seed", 0))
+
+    report = {
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "jobs": jobs or portfolio.default_jobs(),
+        "shots_per_step": [shots_min, shots_max],
+        "results": [],
+    }
+    for steps in sizes:
+        report["results"].extend(run_size(steps, shots_min, shots_max, jobs, seed))
+
+    output = json.dumps(report, indent=2)
+    print(output)
+    if "out" in options:
+        with open(options["out"], "w", encoding="utf-8") as f:
+            f.write(output + "\n")
@@ -8,10 +8,75 @@
 #      py cpp_learn_portfolio.py
 #
 #    → Durchsucht alle Step-Ordner und:
-#        • generiert fehlende Thumbnails (197px)
+#        • generiert fehlende Thumbnails (197px + 394px für HiDPI/srcset,
+#          beide aus nur einer Dekodierung des Screenshots)
+#        • erneuert veraltete Thumbnails (Cache: Inhalts-Hash + Breite in
+#          thumbnails/.thumbcache.json) und löscht verwaiste
 #        • aktualisiert Screenshot-Listen in allen READMEs
+#          (nur wenn sich der Abschnitt ändert; atomar per Temp-Datei)
 #        • sortiert chronologisch (neueste zuerst)
 #
+#    → Schreibt cpp_mastery/INDEX.md: Übersicht aller Steps mit Nummer,
+#      Titel, Anzahl Screenshots, neuestem Thumbnail und Änderungszeit
+#
+#    → Inkrementell: ein Manifest (cpp_mastery/.portfolio_manifest.json)
+#      merkt sich pro Step Ordner-mtimes und Größe/mtime jedes Screenshots. Nur Steps,
+#      deren Eingaben sich geändert haben, werden neu verarbeitet.
+#
+#      py cpp_learn_portfolio.py --full
+#
+#    → Ignoriert das Manifest und verarbeitet alle Steps neu
+#
+#      py cpp_learn_portfolio.py --jobs 4
+#
+#    → Fehlende Thumbnails aller Steps werden gesammelt und parallel
+#      in N Prozessen erzeugt (Standard: Anzahl CPU-Kerne, 1 = seriell)
+#
+#      py cpp_learn_portfolio.py --watch
+#
+#    → Erst ein normales Update, dann Überwachung von steps/ (inotify unter
+#      Linux, sonst Polling). Neue/geänderte Screenshots und neue Step-Ordner
+#      lösen nach kurzer Ruhepause ein Update nur des betroffenen Steps aus.
+#
+#      py cpp_learn_portfolio.py --profile [--profile-json profil.json]
+#
+#    → Misst die Phasen scan/list/plan/decode/resize/encode/render/readme/
+#      manifest und gibt am Ende eine Übersicht pro Phase und pro Step aus
+#      (Anzahl, Summe, p50/p95), optional zusätzlich als JSON
+#
+#      py cpp_learn_portfolio.py --webp
+#
+#    → Erzeugt zusätzlich WebP-Thumbnails (<picture> mit WebP-Quelle)
+#
+#      py cpp_learn_portfolio.py --split-pages
+#
+#    → Große Galerien: Seite 1 bleibt in der README, Seite 2..N landen in
+#      screenshots_page_N.md im Step-Ordner. Jede Datei wird nur neu
+#      geschrieben, wenn sich ihr Ausschnitt der Liste ändert.
+#
+#      py cpp_learn_portfolio.py --dedup [--collapse]
+#      py cpp_learn_portfolio.py --dedup=global
+#
+#    → Inhaltsgleiche Screenshots (SHA1 aus dem Thumbnail-Cache) teilen sich
+#      ein Thumbnail. "global" kopiert vorhandene Thumbnails gleicher Bilder
+#      aus anderen Steps, statt neu zu dekodieren.
+#    → --collapse fasst ähnliche Bilder (16×16-dHash, max. DHASH_DISTANCE Bits
+#      Abweichung) in der Galerie unter dem neuesten zusammen. Strukturarme
+#      Bilder (z.B. fast leeres Terminal) werden nie zusammengefasst. Die
+#      Hashes stehen im Cache – Wiederholungsläufe lesen keine Bilder erneut.
+#
+#      py cpp_learn_portfolio.py --sheets
+#
+#    → Packt die Thumbnails jeder Galerie-Seite in einen Kontaktbogen
+#      (thumbnails/contact_sheet_N.png) – ein Bild-Request statt bis zu
+#      PER_PAGE. Verlinkt per Image-Map, darunter eine nummerierte Linkliste
+#      für Renderer ohne <map>. Ein Bogen wird nur neu gezeichnet, wenn sich
+#      seine Bilder ändern.
+#
+# LOGGING (alle Modi):
+#      --log-json      → update_log.txt als JSON-Zeilen (level/event/step)
+#      --log-keep N    → Anzahl rotierter Logdateien (Standard: LOG_BACKUPS)
+#
 # 2) AUTO-INIT (Automatische Step-Nummer)
 #      py cpp_learn.py Smart Pointers
 #      py cpp_learn.py hallo wallo knallo
@@ -25,31 +90,175 @@
 #        • build/ Ordner
 #        • screenshots/ + thumbnails/ Ordner
 #
+#    → Die nächste Nummer kommt aus dem Step-Index (cpp_mastery/.step_index.json),
+#      der nur neu eingelesen wird, wenn sich steps/ geändert hat. Lücken und
+#      doppelt vergebene Nummern werden dabei gemeldet.
+#
 # 3) MANUELL-INIT (Step selbst angeben)
 #      py cpp_learn.py 05 Smart Pointers
 #      py cpp_learn.py 03 hello world test
+#      py cpp_learn.py 120 templates
+#      py cpp_learn.py --step 7 3 ways to sort
+#
+#    → Legt Step mit gewünschter Nummer an (aufgefüllt auf STEP_WIDTH Stellen)
+#    → Als Nummer zählt das erste Wort nur mit genau STEP_WIDTH Ziffern oder
+#      bis zur nächsten freien Nummer – "3 ways to sort" und "2048 game clone"
+#      werden Titel mit Auto-Nummer. Vergebene Nummern werden abgelehnt.
+#
+#    CMake-Presets (bei 2, 3 und 4):
+#      py cpp_learn.py 05 Smart Pointers --presets release,lto,native
+#
+#    → "default" (Debug, build/) gibt es immer. Standard-Zusatz: release,
+#      relwithdebinfo, lto (IPO) – jedes in build/<name>. "native" baut mit
+#      -march=native und ist nur per --presets dabei; "all" = alle, "none" = keine.
+#
+#    Compile-Zeit (bei 2, 3 und 4):
+#      py cpp_learn.py 05 Smart Pointers --pch --unity
+#
+#    → --pch: target_precompile_headers mit cpp_mastery/common/pch.hpp
+#      (im Superbuild einmal gebaut und per REUSE_FROM geteilt)
+#    → --unity: UNITY_BUILD für Steps mit mehreren .cpp-Dateien
+#
+#      py cpp_learn_portfolio.py retrofit [05 07 ...] --pch --unity
+#
+#    → Trägt den Block nachträglich in bestehende Steps ein (ohne Auswahl: alle)
 #
-#    → Legt Step mit gewünschter Nummer an
+#    Benchmarks (bei 2, 3 und 4, oder per "retrofit --bench"):
+#      py cpp_learn.py 05 Move Semantics --bench
+#
+#    → include/bench.hpp (Header-only Harness), bench/bench_main.cpp und ein
+#      Target step_XX_…_bench in CMakeLists.txt
+#
+# 4) BULK-INIT (viele Steps aus einer Datei)
+#      py cpp_learn_portfolio.py --bulk curriculum.txt
+#
+#    → .txt: eine Zeile pro Step ("05 Smart Pointers" oder nur Titel)
+#      .csv: number,title   .json: ["Titel", {"number": 7, "title": "…"}]
+#      Nummern werden einmal vergeben, alle Konflikte (vergebene oder doppelte
+#      Nummern, vorhandene Ordner) vorab gemeldet – dann wird nichts angelegt.
+#
+# 5) BUILD (alle oder ausgewählte Steps per CMake bauen)
+#      py cpp_learn_portfolio.py build
+#      py cpp_learn_portfolio.py build 05 07 --jobs 4
+#      py cpp_learn_portfolio.py build --cxx /usr/bin/clang++ --force
+#
+#    → configure + build jedes Steps in <step>/build/cli, N Steps parallel
+#      (Standard: CPU-Kerne). Steps, deren src/, include/ und CMake-Dateien
+#      seit dem letzten erfolgreichen Build gleich sind (Hash in
+#      cpp_mastery/.build_cache.json), werden übersprungen (--force baut alle).
+#    → Compiler: --cxx, Umgebungsvariable CPP_LEARN_CXX oder CXX_COMPILER;
+#      Generator: Ninja wenn vorhanden, sonst CMake-Standard
+#    → Am Ende eine Tabelle mit Dauer und Fehlern pro Step
+#    → "build" (und "bench", "run", "optimize", "retrofit") als erstes Wort
+#      ist damit kein Auto-Init-Titel mehr
+#
+#      py cpp_learn_portfolio.py build --superbuild
+#
+#    → Ein configure über cpp_mastery/CMakeLists.txt (add_subdirectory je
+#      Step, von init und update synchron gehalten, dazu Root-Preset
+#      "default") und ein paralleler Build aller Steps in einem Graph
+#
+#
+# 6) BENCH (Micro-Benchmarks aller Steps mit bench/)
+#      py cpp_learn_portfolio.py bench [05 07 ...]
+#
+#    → Baut die Bench-Targets in <step>/build/bench (Release, parallel), lässt
+#      sie nacheinander laufen und sammelt alles in cpp_mastery/BENCH.md
+#      (+ .bench_results.json). Mediane, die mehr als BENCH_THRESHOLD über
+#      dem letzten Lauf liegen, werden als Regression gemeldet (Exit-Code 1).
+#
+# 7) RUN (gebaute Step-Programme ausführen)
+#      py cpp_learn_portfolio.py run [05 07 ...] [--timeout 10] [--force]
+#
+#    → Startet das neueste Executable aus build/ (Preset default) bzw.
+#      build/cli parallel (--jobs), ohne Eingabe, mit Timeout pro Programm.
+#    → Ergebnis pro Binary-Hash in cpp_mastery/.run_cache.json – unveränderte
+#      Programme laufen nicht erneut (--force startet alle).
+#    → Die ersten Ausgabezeilen landen als "▶️ Letzte Ausgabe" direkt vor
+#      "## 📸 Screenshots" in der README.
+#
+# 8) OPTIMIZE (PNG-Screenshots verlustfrei verkleinern)
+#      py cpp_learn_portfolio.py optimize [05 07 ...] [--strip] [--jobs 4]
+#
+#    → Komprimiert PNGs im Prozess-Pool neu (Pixel werden verglichen, nur
+#      kleinere Ergebnisse ersetzen das Original – atomar, mtime bleibt).
+#      --strip entfernt Metadaten (Text, EXIF, ICC-Profil, DPI …).
+#    → Erledigte Dateien merkt sich cpp_mastery/.optimize_cache.json; am Ende
+#      steht die Ersparnis in Bytes.
 #
 # =====================================================================
 
 import os
 import sys
 import re
+import atexit
+import time
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
 
-# Optional: PIL für Thumbnails
-try:
-    from PIL import Image
-    PIL_AVAILABLE = True
-except ImportError:
-    PIL_AVAILABLE = False
-    print("⚠️  PIL nicht installiert. Thumbnails werden übersprungen.")
-    print("   Installation: pip install Pillow")
+# Optional: PIL für Thumbnails – wird erst importiert, wenn wirklich ein Bild
+# verarbeitet wird. Init-Aufrufe laden so keine Bildbibliothek.
+_PIL_INSTALLED = None
+_PIL_IMAGE = None
+_PIL_WARNED = False
+
+def pil_installed():
+    """Prüft still und ohne Import, ob Pillow installiert ist (Ergebnis gecacht)"""
+    global _PIL_INSTALLED
+    if _PIL_INSTALLED is None:
+        import importlib.util
+        _PIL_INSTALLED = importlib.util.find_spec("PIL") is not None
+    return _PIL_INSTALLED
+
+def require_pil():
+    """Wie pil_installed(), gibt auf Bildpfaden (update, optimize) aber einmal den Installationshinweis aus"""
+    global _PIL_WARNED
+    if not pil_installed() and not _PIL_WARNED:
+        _PIL_WARNED = True
+        print("⚠️  PIL nicht installiert. Thumbnails werden übersprungen.")
+        print("   Installation: pip install Pillow")
+    return _PIL_INSTALLED
+
+def pil_image():
+    """Importiert PIL.Image beim ersten Bedarf; None, wenn Pillow fehlt"""
+    global _PIL_IMAGE
+    if _PIL_IMAGE is None and pil_installed():
+        from PIL import Image
+        _PIL_IMAGE = Image
+    return _PIL_IMAGE
 
 THUMB_WIDTH = 197
+THUMB_SCALES = (1, 2)          # Thumbnail-Größen (1x, 2x für HiDPI) – alle aus einer Dekodierung
+THUMB_WEBP = False             # zusätzlich WebP-Varianten erzeugen (--webp)
 PER_PAGE = 25
+SPLIT_PAGES = False            # Seite 1 in der README, weitere Seiten als eigene Dateien (--split-pages)
+PAGE_FILE = "screenshots_page_{}.md"
+PAGE_FILE_PATTERN = re.compile(r"^screenshots_page_\d+\.md$")
+SHEETS = False                 # pro Galerie-Seite ein Kontaktbogen statt einzelner Thumbnails (--sheets)
+SHEET_FILE = "contact_sheet_{}.png"
+SHEET_FILE_PATTERN = re.compile(r"^contact_sheet_\d+\.png$")
+SHEET_CACHE_FILE = ".sheetcache.json"
+SHEET_COLUMNS = 5
+SHEET_GAP = 8                  # Abstand zwischen den Kacheln (1x-Pixel)
 LOGFILE = "update_log.txt"
+LOG_FORMAT = "text"            # "text" oder "json" (JSON-Zeilen mit level/event/step)
+LOG_MAX_BYTES = 1024 * 1024    # ab dieser Größe wird rotiert
+LOG_BACKUPS = 3                # Anzahl aufbewahrter alter Logdateien
+MANIFEST_FILE = ".portfolio_manifest.json"
+MANIFEST_VERSION = 2           # 2: Index-Zeile pro Step ("row")
+INDEX_FILE = "INDEX.md"
+STEP_INDEX_FILE = ".step_index.json"
+STEP_WIDTH = 2                 # Stellen der Step-Nummer (step_05_…); ab 100 automatisch breiter
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg", ".gif"}
+THUMB_EXTENSIONS = IMAGE_EXTENSIONS | {".webp"}
+THUMB_CACHE_FILE = ".thumbcache.json"
+DEDUP = None                   # None, "step" oder "global" (--dedup[=global])
+DEDUP_COLLAPSE = False         # ähnliche Bilder in der Galerie zusammenfassen (--collapse)
+DHASH_SIZE = 16                # dHash aus 16×16 Helligkeits-Gradienten (256 Bit)
+DHASH_DISTANCE = 6             # max. abweichende Bits im dHash für "ähnlich"
+DHASH_MIN_BITS = 16            # weniger gesetzte (oder ungesetzte) Bits → Bild zu strukturarm zum Vergleichen
+OPTIMIZE_CACHE_FILE = ".optimize_cache.json"
+DECODE_BUDGET_MB = 512  # max. Speicher für gleichzeitig dekodierte Bilder im Pool
 
 # ORDNER: Eine Ebene hoch, dann cpp_mastery/steps/
 ROOT_DIR = os.path.abspath(os.path.join(os.getcwd(), "..", "cpp_mastery"))
@@ -58,6 +267,23 @@ STEPS_DIR = os.path.join(ROOT_DIR, "steps")
 # MinGW Pfad (anpassen falls nötig)
 MINGW_PATH = r"C:\Program Files\mingw64\bin"
 
+# C++-Compiler für den build-Modus: leer = was CMake im PATH findet (gcc/clang
+# unter Linux). Überschreibbar per Umgebungsvariable CPP_LEARN_CXX oder --cxx.
+CXX_COMPILER = os.environ.get("CPP_LEARN_CXX") or (os.path.join(MINGW_PATH, "g++.exe") if os.name == "nt" else "")
+BUILD_TYPE = "Debug"
+BUILD_SUBDIR = os.path.join("build", "cli")   # getrennt vom Preset-Build in build/
+BUILD_CACHE_FILE = ".build_cache.json"
+BENCH_SUBDIR = os.path.join("build", "bench")  # Release-Build nur für das Bench-Target
+BENCH_RESULTS_FILE = ".bench_results.json"     # letzter Lauf, Vergleichsbasis für den nächsten
+BENCH_REPORT_FILE = "BENCH.md"
+BENCH_THRESHOLD = 0.10                         # ab +10 % Median gilt als Regression
+BENCH_TIMEOUT = 300                            # Sekunden pro Bench-Binary
+RUN_TIMEOUT = 10                               # Sekunden pro Step-Programm (--timeout)
+RUN_CACHE_FILE = ".run_cache.json"
+RUN_SNIPPET_LINES = 20                         # so viele Ausgabezeilen landen in der README
+RUN_BEGIN = "<!-- cpp_learn run-output -->"
+RUN_END = "<!-- /cpp_learn run-output -->"
+
 # =====================================================================
 # TEMPLATES
 # =====================================================================
@@ -148,29 +374,228 @@ include_directories(include)
 file(GLOB SOURCES "src/*.cpp")
 
 add_executable(step_{step}_{title_norm} ${{SOURCES}})
+{build_speedup}{bench}"""
+
+# Optionaler Block für --pch/--unity; "retrofit" ersetzt ihn in bestehenden Steps
+SPEEDUP_BEGIN = "# >>> cpp_learn build-speedup"
+SPEEDUP_END = "# <<< cpp_learn build-speedup"
+
+SPEEDUP_PCH = """# Vorkompilierter Header: im Superbuild einmal für alle Steps, sonst pro Step
+if(TARGET cpp_mastery_pch)
+    target_precompile_headers(${PROJECT_NAME} REUSE_FROM cpp_mastery_pch)
+else()
+    target_precompile_headers(${PROJECT_NAME} PRIVATE "${CMAKE_CURRENT_SOURCE_DIR}/../../common/pch.hpp")
+endif()
+"""
+
+SPEEDUP_UNITY = """# Unity-Build: mehrere .cpp pro Übersetzungseinheit
+set_target_properties(${PROJECT_NAME} PROPERTIES UNITY_BUILD ON UNITY_BUILD_BATCH_SIZE 8)
+"""
+
+# Optionaler Block für --bench: eigenes Bench-Target aus bench/*.cpp
+BENCH_BEGIN = "# >>> cpp_learn bench"
+BENCH_END = "# <<< cpp_learn bench"
+
+BENCH_CMAKE = """# Micro-Benchmarks (bench/*.cpp, Harness: include/bench.hpp)
+file(GLOB BENCH_SOURCES "bench/*.cpp")
+add_executable(${PROJECT_NAME}_bench ${BENCH_SOURCES})
+"""
+
+BENCH_HEADER_TEMPLATE = """// =====================================================
+// bench.hpp – Header-only Mini-Benchmark-Harness
+// Auto-generated by cpp_learn.py (--bench)
+//
+//   bench::run("name", [] { ...; bench::do_not_optimize(x); });
+//
+// Kalibriert die Iterationszahl, bis eine Messung >= 10 ms dauert, misst
+// dann mehrere Samples und gibt pro Benchmark eine JSON-Zeile aus
+// (wird von "py cpp_learn_portfolio.py bench" eingesammelt).
+// =====================================================
+
+#pragma once
+
+#include <algorithm>
+#include <atomic>
+#include <chrono>
+#include <cstddef>
+#include <cstdio>
+#include <vector>
+
+namespace bench {
+
+// Verhindert, dass der Compiler das Ergebnis wegoptimiert
+template <class T>
+inline void do_not_optimize(T const& value) {
+#if defined(__GNUC__) || defined(__clang__)
+    asm volatile("" : : "m"(value) : "memory");
+#else
+    static volatile char sink;
+    sink = *reinterpret_cast<char const volatile*>(&value);
+    std::atomic_signal_fence(std::memory_order_seq_cst);
+#endif
+}
+
+// Erzwingt, dass Schreibzugriffe vor diesem Punkt sichtbar werden
+inline void clobber_memory() {
+#if defined(__GNUC__) || defined(__clang__)
+    asm volatile("" : : : "memory");
+#else
+    std::atomic_signal_fence(std::memory_order_seq_cst);
+#endif
+}
+
+template <class F>
+inline void run(char const* name, F&& body, int samples = 15, double min_sample_ms = 10.0) {
+    using clock = std::chrono::steady_clock;
+    auto time_batch = [&](std::size_t iterations) {
+        auto start = clock::now();
+        for (std::size_t i = 0; i < iterations; ++i) {
+            body();
+        }
+        return std::chrono::duration<double, std::nano>(clock::now() - start).count();
+    };
+
+    // Kalibrieren: Iterationen verdoppeln, bis ein Sample lang genug ist
+    std::size_t iterations = 1;
+    while (time_batch(iterations) < min_sample_ms * 1e6 && iterations < (std::size_t{1} << 40)) {
+        iterations *= 2;
+    }
+
+    std::vector<double> per_op;
+    per_op.reserve(static_cast<std::size_t>(samples));
+    for (int s = 0; s < samples; ++s) {
+        per_op.push_back(time_batch(iterations) / static_cast<double>(iterations));
+    }
+    std::sort(per_op.begin(), per_op.end());
+
+    std::printf("{\\"name\\": \\"%s\\", \\"iterations\\": %llu, \\"samples\\": %d, "
+                "\\"median_ns\\": %.3f, \\"min_ns\\": %.3f, \\"max_ns\\": %.3f}\\n",
+                name, static_cast<unsigned long long>(iterations), samples,
+                per_op[per_op.size() / 2], per_op.front(), per_op.back());
+    std::fflush(stdout);
+}
+
+}  // namespace bench
+"""
+
+BENCH_MAIN_TEMPLATE = """// =====================================================
+// Step {step}: {title} – Benchmarks
+// Release-Build + Lauf: py cpp_learn_portfolio.py bench {step}
+// =====================================================
+
+#include "bench.hpp"
+
+#include <vector>
+
+int main() {{
+    bench::run("vector_push_back_1000", [] {{
+        std::vector<int> v;
+        for (int i = 0; i < 1000; ++i) {{
+            v.push_back(i);
+        }}
+        bench::do_not_optimize(v.data());
+    }});
+
+    bench::run("vector_reserve_push_back_1000", [] {{
+        std::vector<int> v;
+        v.reserve(1000);
+        for (int i = 0; i < 1000; ++i) {{
+            v.push_back(i);
+        }}
+        bench::do_not_optimize(v.data());
+    }});
+
+    return 0;
+}}
+"""
+
+# Gemeinsamer Header unter cpp_mastery/common/ (wird nie überschrieben)
+PCH_HEADER_TEMPLATE = """// =====================================================
+// Gemeinsamer vorkompilierter Header aller Steps
+// Auto-generated by cpp_learn.py – nur stabile, oft genutzte Header eintragen
+// =====================================================
+
+#pragma once
+
+#include <algorithm>
+#include <array>
+#include <chrono>
+#include <iostream>
+#include <map>
+#include <memory>
+#include <string>
+#include <utility>
+#include <vector>
+"""
+
+PCH_SOURCE_TEMPLATE = """// Leere Übersetzungseinheit für das Superbuild-Target cpp_mastery_pch
 """
 
-def get_cmake_presets(step, title_norm):
-    """Gibt CMakePresets.json als Dict zurück"""
+# Zusätzliche Presets neben "default" (Debug in build/). Jedes baut in
+# build/<name>, damit sich die Konfigurationen nicht gegenseitig überschreiben.
+OPTIMIZED_PRESETS = {
+    "release": {"CMAKE_BUILD_TYPE": "Release"},
+    "relwithdebinfo": {"CMAKE_BUILD_TYPE": "RelWithDebInfo"},
+    "lto": {"CMAKE_BUILD_TYPE": "Release", "CMAKE_INTERPROCEDURAL_OPTIMIZATION": "ON"},
+    # Nur für die eigene Maschine – Binaries laufen evtl. nicht auf anderen CPUs
+    "native": {"CMAKE_BUILD_TYPE": "Release", "CMAKE_CXX_FLAGS": "-march=native"},
+}
+DEFAULT_PRESETS = ("release", "relwithdebinfo", "lto")   # "native" nur per --presets
+
+def parse_presets(value):
+    """--presets "release,lto,native" → Tupel; "none" = nur default.
+
+    Wirft ValueError bei unbekannten Namen.
+    """
+    names = [name.strip().lower() for name in str(value).split(",") if name.strip()]
+    if names in (["none"], ["default"]):
+        return ()
+    if names == ["all"]:
+        return tuple(OPTIMIZED_PRESETS)
+    unknown = [name for name in names if name not in OPTIMIZED_PRESETS]
+    if unknown:
+        raise ValueError(f"unbekannte Presets: {', '.join(unknown)} "
+                         f"(möglich: {', '.join(OPTIMIZED_PRESETS)}, all, none)")
+    return tuple(dict.fromkeys(names))
+
+def get_cmake_presets(step, title_norm, presets=DEFAULT_PRESETS):
+    """Gibt CMakePresets.json als Dict zurück.
+
+    "default" (Debug in build/) gibt es immer, dazu je Name aus presets
+    ein Preset aus OPTIMIZED_PRESETS mit eigenem binaryDir.
+    """
+    configure = [
+        {
+            "name": "base",
+            "hidden": True,
+            "generator": "Ninja",
+            "cacheVariables": {
+                "CMAKE_C_COMPILER": f"{MINGW_PATH}/gcc.exe",
+                "CMAKE_CXX_COMPILER": f"{MINGW_PATH}/g++.exe"
+            }
+        },
+        {
+            "name": "default",
+            "inherits": "base",
+            "binaryDir": "${sourceDir}/build",
+            "cacheVariables": {
+                "CMAKE_BUILD_TYPE": "Debug"
+            }
+        }
+    ]
+    for name in presets:
+        configure.append({
+            "name": name,
+            "inherits": "base",
+            "binaryDir": f"${{sourceDir}}/build/{name}",
+            "cacheVariables": dict(OPTIMIZED_PRESETS[name])
+        })
     return {
         "version": 3,
-        "configurePresets": [
-            {
-                "name": "default",
-                "generator": "Ninja",
-                "binaryDir": "${sourceDir}/build",
-                "cacheVariables": {
-                    "CMAKE_BUILD_TYPE": "Debug",
-                    "CMAKE_C_COMPILER": f"{MINGW_PATH}/gcc.exe",
-                    "CMAKE_CXX_COMPILER": f"{MINGW_PATH}/g++.exe"
-                }
-            }
-        ],
+        "configurePresets": configure,
         "buildPresets": [
-            {
-                "name": "default",
-                "configurePreset": "default"
-            }
+            {"name": preset["name"], "configurePreset": preset["name"]}
+            for preset in configure if not preset.get("hidden")
         ]
     }
 
@@ -218,6 +643,29 @@ LAUNCH_JSON_TEMPLATE = """
 }
 """
 
+SUPERBUILD_MARKER = "Auto-generated by cpp_learn_portfolio.py (Superbuild)"
+
+SUPERBUILD_TEMPLATE = """# =====================================================
+# cpp_mastery Superbuild – alle Steps in einem CMake-Projekt
+# {marker}
+# Wird bei init und update neu geschrieben – nicht von Hand bearbeiten.
+# =====================================================
+
+cmake_minimum_required(VERSION 3.16)
+project(cpp_mastery LANGUAGES CXX)
+{pch}
+{subdirectories}
+"""
+
+SUPERBUILD_PCH = """
+set(CMAKE_CXX_STANDARD 20)
+set(CMAKE_CXX_STANDARD_REQUIRED ON)
+
+# Gemeinsamer vorkompilierter Header – Steps mit --pch nutzen ihn per REUSE_FROM
+add_library(cpp_mastery_pch OBJECT common/pch.cpp)
+target_precompile_headers(cpp_mastery_pch PRIVATE common/pch.hpp)
+"""
+
 GITIGNORE_TEMPLATE = """# =====================================================
 # .gitignore für C++ Learning Project
 # Auto-generated by cpp_learn.py
@@ -256,104 +704,1042 @@ GITIGNORE_TEMPLATE = """# =====================================================
 **/update_log.txt
 *.log
 
+{state}
 # OS
 .DS_Store
 Thumbs.db
 """
 
+# Maschinenlokaler Zustand des Scripts (absolute mtimes, Compiler-Pfade …).
+# .optimize_cache.json bleibt absichtlich versioniert: optimierte PNGs
+# werden so auch in anderen Clones übersprungen.
+GITIGNORE_STATE = """# Script-Zustand (lokal)
+/.portfolio_manifest.json
+/.step_index.json
+/.build_cache.json
+/.run_cache.json
+"""
+
 # =====================================================================
 # Logging
 # =====================================================================
 
-def log(msg: str):
-    """Schreibt Log-Einträge in update_log.txt"""
+# Einträge werden gepuffert und einmal pro Lauf geschrieben (flush_log()
+# läuft per atexit auch bei Exceptions). Worker-Prozesse loggen nicht selbst.
+_LOG_BUFFER = []
+_LOG_LEVELS = {"ERROR": "error", "WARN": "warning"}
+
+def log(msg: str, level=None, event=None, step=None):
+    """Merkt einen Log-Eintrag für update_log.txt vor.
+
+    "[TAG] text" wird zerlegt: TAG wird zum event, ERROR/WARN bestimmen
+    das level (sonst info). step ist optional der Step-Ordnername.
+    """
+    match = re.match(r"\[(\w+)\]\s*", msg)
+    if match:
+        event = event or match.group(1)
+        text = msg[match.end():]
+    else:
+        text = msg
+    level = level or _LOG_LEVELS.get(event, "info")
+    _LOG_BUFFER.append((datetime.now(), level, event, step, msg, text))
+
+def _format_log_entry(entry):
+    """Formatiert einen Eintrag als Textzeile oder JSON-Zeile"""
+    timestamp, level, event, step, msg, text = entry
+    if LOG_FORMAT == "json":
+        import json
+        record = {"time": timestamp.isoformat(), "level": level, "event": event, "msg": text}
+        if step:
+            record["step"] = step
+        return json.dumps(record, ensure_ascii=False) + "\n"
+    return f"{timestamp} | {msg}\n"
+
+def _rotate_log(log_path):
+    """update_log.txt → .1 → .2 …; behält LOG_BACKUPS alte Dateien"""
+    if LOG_BACKUPS <= 0:
+        os.remove(log_path)
+        return
+    for i in range(LOG_BACKUPS - 1, 0, -1):
+        src = f"{log_path}.{i}"
+        if os.path.exists(src):
+            os.replace(src, f"{log_path}.{i + 1}")
+    os.replace(log_path, f"{log_path}.1")
+
+def flush_log():
+    """Schreibt alle gepufferten Einträge in einem Rutsch (mit Rotation)"""
+    if not _LOG_BUFFER:
+        return
+    data = "".join(_format_log_entry(entry) for entry in _LOG_BUFFER)
+    _LOG_BUFFER.clear()
     log_path = os.path.join(os.getcwd(), LOGFILE)
+    try:
+        size = os.path.getsize(log_path)
+    except OSError:
+        size = 0
+    if size and size + len(data.encode("utf-8")) > LOG_MAX_BYTES:
+        _rotate_log(log_path)
     with open(log_path, "a", encoding="utf-8") as f:
-        f.write(f"{datetime.now()} | {msg}\n")
+        f.write(data)
+
+atexit.register(flush_log)
+
+# =====================================================================
+# Profiling (--profile)
+# =====================================================================
+
+# None = aus. Sonst {"phases": {phase: [s, ...]}, "steps": {step: {phase: [s, ...]}}}
+PROFILE = None
+_NO_PHASE = nullcontext()
+
+def profile_record(name, seconds, step=None):
+    """Trägt eine gemessene Dauer ein (no-op ohne --profile)"""
+    if PROFILE is None:
+        return
+    PROFILE["phases"].setdefault(name, []).append(seconds)
+    if step:
+        PROFILE["steps"].setdefault(step, {}).setdefault(name, []).append(seconds)
+
+@contextmanager
+def _timed_phase(name, step):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile_record(name, time.perf_counter() - start, step)
+
+def phase(name, step=None):
+    """with phase("readme", step): ... – misst nur, wenn PROFILE aktiv ist"""
+    if PROFILE is None:
+        return _NO_PHASE
+    return _timed_phase(name, step)
+
+def _percentile(values, p):
+    """p-Quantil (0..1) einer Liste, nächster Rang"""
+    import math
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(p * len(ordered)) - 1))
+    return ordered[index]
+
+def _summarize(durations):
+    """count/total/p50/p95 in Millisekunden"""
+    return {
+        "count": len(durations),
+        "total_ms": round(sum(durations) * 1000, 3),
+        "p50_ms": round(_percentile(durations, 0.50) * 1000, 3),
+        "p95_ms": round(_percentile(durations, 0.95) * 1000, 3),
+    }
+
+def profile_report(json_path=None):
+    """Gibt die Phasen- und Step-Übersicht aus und schreibt sie optional als JSON"""
+    if PROFILE is None:
+        return
+    phases = {name: _summarize(d) for name, d in PROFILE["phases"].items()}
+    steps = {
+        step: {name: _summarize(d) for name, d in per_phase.items()}
+        for step, per_phase in PROFILE["steps"].items()
+    }
+
+    print("\n⏱️  PROFIL pro Phase")
+    print(f"   {'Phase':<12} {'Anzahl':>7} {'Summe ms':>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for name, st in sorted(phases.items(), key=lambda kv: -kv[1]["total_ms"]):
+        print(f"   {name:<12} {st['count']:>7} {st['total_ms']:>10.1f} {st['p50_ms']:>9.2f} {st['p95_ms']:>9.2f}")
+
+    if steps:
+        print("\n⏱️  PROFIL pro Step (Summe ms je Phase)")
+        totals = {step: sum(st["total_ms"] for st in per.values()) for step, per in steps.items()}
+        for step in sorted(steps, key=lambda name: -totals[name]):
+            detail = ", ".join(f"{name} {st['total_ms']:.1f}" for name, st in sorted(steps[step].items()))
+            print(f"   {step:<40} {totals[step]:>9.1f}  ({detail})")
+
+    if json_path:
+        import json
+        write_text_atomic(json_path, json.dumps({"phases": phases, "steps": steps}, indent=2))
+        print(f"\n📄 Profil gespeichert: {json_path}")
+
+# =====================================================================
+# Dateien schreiben (atomar, nur bei Änderung)
+# =====================================================================
+
+_NEW_FILE_MODE = None
+
+def new_file_mode():
+    """Rechte für neu angelegte Dateien (0o666 ohne umask), wie bei open(..., "w")"""
+    global _NEW_FILE_MODE
+    if _NEW_FILE_MODE is None:
+        umask = os.umask(0)
+        os.umask(umask)
+        _NEW_FILE_MODE = 0o666 & ~umask
+    return _NEW_FILE_MODE
+
+def write_text_atomic(path, content):
+    """Schreibt über eine Temp-Datei im selben Ordner + os.replace.
+
+    Leser sehen so immer entweder die alte oder die neue Datei, nie eine
+    halb geschriebene. Dateirechte der alten Datei bleiben erhalten; neue
+    Dateien bekommen die üblichen Rechte statt der 0600 von mkstemp.
+    """
+    import tempfile
+    import shutil
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+        else:
+            os.chmod(tmp_path, new_file_mode())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_if_changed(path, content):
+    """Schreibt nur, wenn sich der Inhalt unterscheidet; True = geschrieben"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    write_text_atomic(path, content)
+    return True
 
 # =====================================================================
 # Thumbnail Generator
 # =====================================================================
 
+def _draft_size():
+    """Zielgröße für reduziertes Dekodieren (2x Puffer wie Pillows reducing_gap)"""
+    width = THUMB_WIDTH * max(THUMB_SCALES)
+    return (width * 2, width * 2)
+
+def thumbnail_variants(fname):
+    """Alle Thumbnail-Dateien zu einem Screenshot → [(name, scale, format)].
+
+    1x behält den Screenshot-Namen, weitere Größen heißen bild@2x.png,
+    WebP-Varianten hängen .webp an (bild.png.webp, bild@2x.png.webp).
+    format ist None für "wie das Original".
+    """
+    stem, ext = os.path.splitext(fname)
+    variants = []
+    for scale in THUMB_SCALES:
+        name = fname if scale == 1 else f"{stem}@{scale}x{ext}"
+        variants.append((name, scale, None))
+        if THUMB_WEBP:
+            variants.append((name + ".webp", scale, "WEBP"))
+    return variants
+
+def thumbnail_outputs(thumb_path):
+    """Ausgaben für _render_thumbnail() zum 1x-Thumbnail-Pfad"""
+    thumbs, fname = os.path.split(thumb_path)
+    return [(os.path.join(thumbs, name), THUMB_WIDTH * scale, fmt)
+            for name, scale, fmt in thumbnail_variants(fname)]
+
+def _render_thumbnail(input_path, outputs):
+    """Dekodiert einmal und speichert alle Thumbnail-Varianten (wirft bei Fehlern).
+
+    outputs ist [(Pfad, Breite, Format)], siehe thumbnail_variants().
+    JPEGs werden per draft() direkt in 1/2, 1/4 oder 1/8 Auflösung
+    dekodiert (passend zur größten Variante); jede Größe wird aus
+    demselben dekodierten Bild verkleinert.
+    Gibt (Schnellpfad ja/nein, Dauern für decode/resize/encode, dHash) zurück.
+    """
+    Image = pil_image()
+    if Image is None:
+        raise RuntimeError("Pillow nicht installiert")
+    start = time.perf_counter()
+    resize = encode = 0.0
+    with Image.open(input_path) as img:
+        fast = False
+        if img.format == "JPEG":
+            full_size = img.size
+            img.draft(None, _draft_size())
+            fast = img.size != full_size
+        img.load()
+        decoded = time.perf_counter()
+        sized = {}
+        for output_path, width, fmt in outputs:
+            t = time.perf_counter()
+            if width not in sized:
+                thumb = img.copy()
+                thumb.thumbnail((width, width))
+                sized[width] = thumb
+            t2 = time.perf_counter()
+            if fmt == "WEBP":
+                sized[width].save(output_path, "WEBP", quality=85, method=4)
+            else:
+                sized[width].save(output_path)
+            t3 = time.perf_counter()
+            resize += t2 - t
+            encode += t3 - t2
+        dhash = _dhash(sized[min(sized)]) if sized else None
+    return fast, (decoded - start, resize, encode), dhash
+
+def _dhash(img):
+    """Differenz-Hash (DHASH_SIZE² Bit) als Hex; ähnliche Bilder → kleine Hamming-Distanz"""
+    size = DHASH_SIZE
+    pixels = img.convert("L").resize((size + 1, size)).tobytes()
+    bits = 0
+    for row in range(size):
+        for col in range(size):
+            bits = (bits << 1) | (pixels[row * (size + 1) + col] > pixels[row * (size + 1) + col + 1])
+    return f"{bits:0{size * size // 4}x}"
+
+def dhash_comparable(dhash):
+    """Taugt der Hash zum Vergleichen? Nein bei alter Größe oder zu wenig Struktur.
+
+    Fast einfarbige Bilder (z.B. ein dunkles Terminal mit wenig Text) haben
+    kaum Gradienten; ihre Hashes liegen nahe 0 und damit nahe beieinander,
+    egal wie verschieden der Inhalt ist.
+    """
+    if not dhash or len(dhash) != DHASH_SIZE * DHASH_SIZE // 4:
+        return False
+    ones = bin(int(dhash, 16)).count("1")
+    return DHASH_MIN_BITS <= ones <= DHASH_SIZE * DHASH_SIZE - DHASH_MIN_BITS
+
+def image_dhash(input_path):
+    """dHash eines Bildes ohne Thumbnail (JPEG stark reduziert dekodiert)"""
+    with pil_image().open(input_path) as img:
+        if img.format == "JPEG":
+            img.draft(None, (64, 64))
+        img.thumbnail((64, 64))
+        return _dhash(img)
+
+def hamming(a, b):
+    """Anzahl unterschiedlicher Bits zweier Hex-Hashes"""
+    return bin(int(a, 16) ^ int(b, 16)).count("1")
+
+def _step_of(input_path):
+    """Step-Ordnername zu .../step_XX/screenshots/bild.png"""
+    return os.path.basename(os.path.dirname(os.path.dirname(input_path)))
+
+def _record_thumbnail_timings(input_path, timings):
+    """Überträgt die im (Worker-)Prozess gemessenen Zeiten ins Profil"""
+    if PROFILE is None or not timings:
+        return
+    step = _step_of(input_path)
+    for name, seconds in zip(("decode", "resize", "encode"), timings):
+        profile_record(name, seconds, step)
+
+def estimate_decode_bytes(input_path):
+    """Schätzt den Speicherbedarf beim Dekodieren (liest nur den Header)"""
+    try:
+        with pil_image().open(input_path) as img:
+            width, height = img.size
+            bands = len(img.getbands())
+            if img.format == "JPEG":
+                target = _draft_size()
+                ratio = min(width // target[0], height // target[1])
+                scale = next((s for s in (8, 4, 2) if ratio >= s), 1)
+                width, height = -(-width // scale), -(-height // scale)
+    except Exception:
+        return 0
+    return width * height * bands
+
 def create_thumbnail(input_path, output_path):
-    """Erstellt ein Thumbnail aus einem Bild"""
-    if not PIL_AVAILABLE:
+    """Erstellt alle Thumbnail-Varianten (1x/2x, ggf. WebP) aus einem Bild.
+
+    output_path ist das 1x-Thumbnail; die übrigen Varianten landen daneben.
+    """
+    if not pil_installed():
         return False
     
     try:
-        img = Image.open(input_path)
-        img.thumbnail((THUMB_WIDTH, THUMB_WIDTH))
-        img.save(output_path)
+        _, timings, _ = _render_thumbnail(input_path, thumbnail_outputs(output_path))
+        _record_thumbnail_timings(input_path, timings)
         return True
     except Exception as e:
         log(f"[ERROR] Konnte Thumbnail nicht erzeugen: {input_path} → {e}")
         return False
 
+def _thumbnail_worker(job):
+    """Läuft im Worker-Prozess; gibt (Fehlertext, Schnellpfad, Zeiten, dHash) zurück statt zu loggen"""
+    input_path, outputs = job
+    try:
+        fast, timings, dhash = _render_thumbnail(input_path, outputs)
+        return None, fast, timings, dhash
+    except Exception as e:
+        return str(e), False, None, None
+
+def default_jobs():
+    """Standard für --jobs: Anzahl CPU-Kerne"""
+    return os.cpu_count() or 1
+
+def generate_thumbnails(jobs, workers=None):
+    """Erzeugt alle Thumbnails aus jobs [(input, [(output, Breite, Format), ...]), ...].
+
+    Ab zwei Jobs und workers > 1 wird ein Prozess-Pool genutzt, sonst
+    seriell. Im Pool wird nur so viel gleichzeitig dekodiert, wie in
+    DECODE_BUDGET_MB passt (ein einzelnes größeres Bild läuft trotzdem).
+    Fehler landen wie bisher im Log. Gibt (fehlgeschlagene Eingabepfade,
+    Anzahl Schnellpfad-Dekodierungen, {Eingabepfad: dHash}) zurück.
+    """
+    if not pil_installed() or not jobs:
+        return {input_path for input_path, _ in jobs}, 0, {}
+
+    if workers is None:
+        workers = default_jobs()
+    workers = min(workers, len(jobs))
+
+    failed = set()
+    fast = 0
+    dhashes = {}
+
+    def collect(input_path, result):
+        nonlocal fast
+        error, was_fast, timings, dhash = result
+        if dhash:
+            dhashes[input_path] = dhash
+        _record_thumbnail_timings(input_path, timings)
+        if error is not None:
+            failed.add(input_path)
+            log(f"[ERROR] Konnte Thumbnail nicht erzeugen: {input_path} → {error}")
+        elif was_fast:
+            fast += 1
+
+    if workers <= 1:
+        for job in jobs:
+            collect(job[0], _thumbnail_worker(job))
+        return failed, fast, dhashes
+
+    from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+    budget = DECODE_BUDGET_MB * 1024 * 1024
+    in_flight = {}
+    used = 0
+    queue = list(reversed(jobs))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while queue or in_flight:
+            # Nachschieben, solange Worker frei sind und das Budget reicht
+            while queue and len(in_flight) < workers:
+                cost = estimate_decode_bytes(queue[-1][0])
+                if in_flight and used + cost > budget:
+                    break
+                job = queue.pop()
+                in_flight[pool.submit(_thumbnail_worker, job)] = (job[0], cost)
+                used += cost
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                input_path, cost = in_flight.pop(future)
+                used -= cost
+                collect(input_path, future.result())
+    return failed, fast, dhashes
+
 # =====================================================================
-# Update Screenshots für EINEN Step
+# Step-Scanner (ein os.scandir-Durchlauf statt vieler Einzel-stats)
 # =====================================================================
 
-def update_screenshots(folder_path):
-    """Aktualisiert die Screenshot-Liste in einem Step-Ordner"""
-    screenshots = os.path.join(folder_path, "screenshots")
-    thumbs = os.path.join(folder_path, "thumbnails")
+def _scan_images(path, extensions=IMAGE_EXTENSIONS):
+    """scandir über einen Bildordner → {name: stat_result}"""
+    images = {}
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if os.path.splitext(entry.name)[1].lower() in extensions and entry.is_file():
+                    images[entry.name] = entry.stat()
+    except FileNotFoundError:
+        pass
+    return images
+
+def scan_step(folder_path, dir_mtime=None):
+    """Erfasst die oberste Ebene eines Step-Ordners in einem scandir.
+
+    Das Modell ist ein Dict mit README-stat, den mtimes von
+    screenshots/ und thumbnails/ und den ausgelagerten Galerie-Seiten. Die Bildlisten ("screenshots",
+    "thumbnails") bleiben None, bis scan_step_images() sie füllt.
+    """
+    step = {
+        "name": os.path.basename(folder_path),
+        "path": folder_path,
+        "dir": dir_mtime if dir_mtime is not None else os.stat(folder_path).st_mtime_ns,
+        "readme": None,
+        "screenshots_dir": None,
+        "thumbnails_dir": None,
+        "screenshots": None,
+        "thumbnails": None,
+        "pages": [],
+        "cmake": False,
+    }
+    with os.scandir(folder_path) as it:
+        for entry in it:
+            if entry.name == "README.md" and entry.is_file():
+                st = entry.stat()
+                step["readme"] = [st.st_mtime_ns, st.st_size]
+            elif entry.name == "screenshots" and entry.is_dir():
+                step["screenshots_dir"] = entry.stat().st_mtime_ns
+            elif entry.name == "thumbnails" and entry.is_dir():
+                step["thumbnails_dir"] = entry.stat().st_mtime_ns
+            elif entry.name == "CMakeLists.txt":
+                step["cmake"] = True
+            elif PAGE_FILE_PATTERN.match(entry.name):
+                step["pages"].append(entry.name)
+    step["pages"].sort()
+    return step
+
+def _scan_screenshots(step):
+    """Füllt step["screenshots"] [(name, mtime, size)] mit einem scandir"""
+    step["screenshots"] = []
+    if step["screenshots_dir"] is not None:
+        images = _scan_images(os.path.join(step["path"], "screenshots"))
+        step["screenshots"] = [(name, st.st_mtime, st.st_size) for name, st in images.items()]
+
+def scan_step_images(step, reuse=False):
+    """Füllt screenshots [(name, mtime, size)] und thumbnails {name: mtime_ns}.
+
+    reuse: eine bereits gelesene Screenshot-Liste (screenshot_stats) übernehmen.
+    """
+    if not (reuse and step["screenshots"] is not None):
+        _scan_screenshots(step)
+    step["thumbnails"] = {}
+    if step["thumbnails_dir"] is not None:
+        images = _scan_images(os.path.join(step["path"], "thumbnails"), THUMB_EXTENSIONS)
+        step["thumbnails"] = {name: st.st_mtime_ns for name, st in images.items()}
+    return step
+
+def scan_steps(steps_dir=None):
+    """Liest alle step_* Ordner (oberste Ebene) in einem Durchlauf, sortiert nach Name"""
+    steps_dir = steps_dir or STEPS_DIR
+    steps = []
+    with os.scandir(steps_dir) as it:
+        for entry in it:
+            if entry.name.startswith("step_") and entry.is_dir():
+                steps.append(scan_step(entry.path, entry.stat().st_mtime_ns))
+    steps.sort(key=lambda step: step["name"])
+    return steps
+
+def fingerprint(step):
+    """Billiger Fingerabdruck eines Steps: nur Ordner- und README-stats"""
+    return {
+        "dir": step["dir"],
+        "screenshots": step["screenshots_dir"],
+        "thumbnails": step["thumbnails_dir"],
+        "readme": step["readme"],
+    }
 
-    if not os.path.exists(screenshots):
-        log(f"[SKIP] Kein screenshot-Ordner in {folder_path}")
-        return "- Noch keine Screenshots"
+def screenshot_stats(step):
+    """{Name: [Größe, mtime]} der Screenshots aus einem scandir (Format wie im Manifest).
 
-    if PIL_AVAILABLE and not os.path.exists(thumbs):
-        os.makedirs(thumbs)
-        log(f"[CREATE] thumbnails/ erstellt in {folder_path}")
+    Fängt überschriebene Bilder gleichen Namens ab, die die mtime des
+    screenshots/-Ordners nicht ändern. Die Liste bleibt am Step, damit
+    scan_step_images(step, reuse=True) den Ordner nicht erneut liest.
+    """
+    if step["screenshots"] is None:
+        _scan_screenshots(step)
+    return {name: [size, mtime] for name, mtime, size in step["screenshots"]}
 
-    # Alle Bilder finden
-    files = []
-    for f in os.listdir(screenshots):
-        ext = os.path.splitext(f)[1].lower()
-        if ext in {".png", ".jpg", ".jpeg", ".gif"}:
-            full = os.path.join(screenshots, f)
-            mtime = os.path.getmtime(full)
-            files.append((f, mtime))
+def step_fingerprint(folder_path):
+    """Fingerabdruck direkt vom Dateisystem (nach dem Schreiben)"""
+    return fingerprint(scan_step(folder_path))
 
-    if not files:
-        return "- Noch keine Screenshots"
+# =====================================================================
+# Thumbnail-Cache (Inhalts-Hash + THUMB_WIDTH)
+# =====================================================================
 
-    # Neueste zuerst
-    files.sort(key=lambda x: x[1], reverse=True)
+def file_sha1(path):
+    """SHA1 über den Dateiinhalt (blockweise gelesen)"""
+    import hashlib
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
-    # Thumbnails erzeugen & Markdown erstellen
-    md_pages = []
-    current_page = []
+def load_thumb_cache(thumbs):
+    """Lädt thumbnails/.thumbcache.json; bei anderer THUMB_WIDTH leer.
+
+    Größen und Formate stecken im Dateinamen der Varianten (bild@2x.png,
+    bild.png.webp); ob alle da sind, prüft plan_thumbnails().
 
-    for fname, _ in files:
+    Gibt None zurück, wenn es (noch) gar keinen Cache gibt.
+    """
+    import json
+    try:
+        with open(os.path.join(thumbs, THUMB_CACHE_FILE), "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except OSError:
+        return None
+    except ValueError:
+        return {}
+    if cache.get("width") != THUMB_WIDTH:
+        return {}
+    return cache.get("entries", {})
+
+def save_thumb_cache(thumbs, entries):
+    """Schreibt den Thumbnail-Cache eines Steps"""
+    import json
+    write_text_atomic(os.path.join(thumbs, THUMB_CACHE_FILE),
+                      json.dumps({"width": THUMB_WIDTH, "entries": entries}, indent=1, sort_keys=True))
+
+def load_shared_thumbs():
+    """sha1 → (thumbnails-Ordner, Screenshot-Name) über alle Steps (--dedup=global).
+
+    Liest nur die .thumbcache.json der Steps, keine Bilder.
+    """
+    import json
+    shared = {}
+    for step in scan_steps():
+        thumbs = os.path.join(step["path"], "thumbnails")
+        try:
+            with open(os.path.join(thumbs, THUMB_CACHE_FILE), "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if cache.get("width") != THUMB_WIDTH:
+            continue
+        for fname, entry in cache.get("entries", {}).items():
+            if "same_as" not in entry:
+                shared.setdefault(entry["sha1"], (thumbs, fname))
+    return shared
+
+def copy_shared_thumbnail(source, thumbs, fname, existing):
+    """Kopiert alle Varianten eines gleichen Bildes (anderer Step oder anderer Name) statt zu dekodieren"""
+    import shutil
+    src_thumbs, src_name = source
+    if os.path.splitext(src_name)[1].lower() != os.path.splitext(fname)[1].lower():
+        return False    # Thumbnails liegen im Format des Originals vor
+    pairs = [(os.path.join(src_thumbs, src), os.path.join(thumbs, dst))
+             for (src, *_), (dst, *_) in zip(thumbnail_variants(src_name), thumbnail_variants(fname))]
+    if not all(os.path.exists(src) for src, _ in pairs):
+        return False
+    for src, dst in pairs:
+        shutil.copy2(src, dst)
+        existing[os.path.basename(dst)] = _mtime_ns(dst)
+    return True
+
+def plan_thumbnails(step, files, find_shared=None):
+    """Gleicht Screenshots mit dem Thumbnail-Cache ab.
+
+    Gibt (jobs, cache) zurück: jobs sind (input, outputs) für fehlende oder
+    veraltete Thumbnails – immer alle Varianten eines Screenshots, damit er
+    nur einmal dekodiert wird. cache enthält bereits die neuen Einträge.
+    Thumbnails ohne zugehörigen Screenshot werden gelöscht.
+
+    Mit DEDUP bekommt ein inhaltsgleicher Screenshot kein eigenes Thumbnail
+    (Eintrag "same_as"); find_shared(sha1) liefert bei --dedup=global ein
+    gleiches Bild aus einem anderen Step, dessen Thumbnails kopiert werden.
+    """
+    if not pil_installed():
+        return [], {}
+    screenshots = os.path.join(step["path"], "screenshots")
+    thumbs = os.path.join(step["path"], "thumbnails")
+    existing = step["thumbnails"]
+    old_cache = load_thumb_cache(thumbs) if existing else None
+    legacy = old_cache is None
+    old_cache = old_cache or {}
+    cache = {}
+    jobs = []
+    seen = {}   # sha1 → erster (neuester) Screenshot mit diesem Inhalt
+    # sha1 → Screenshot, dessen Thumbnails schon in diesem Step liegen
+    local = {entry["sha1"]: fname for fname, entry in old_cache.items() if "same_as" not in entry}
+
+    for fname, mtime, size in files:
         input_path = os.path.join(screenshots, fname)
-        thumb_path = os.path.join(thumbs, fname) if PIL_AVAILABLE else None
+        thumb_path = os.path.join(thumbs, fname)
+        entry = old_cache.get(fname)
 
-        # Thumbnail erzeugen falls nicht vorhanden
-        if PIL_AVAILABLE and thumb_path and not os.path.exists(thumb_path):
-            create_thumbnail(input_path, thumb_path)
+        # Gleiche Größe & mtime → Hash aus dem Cache, ohne die Datei zu lesen
+        if entry and entry["size"] == size and entry["mtime"] == mtime:
+            digest = entry["sha1"]
+        else:
+            digest = file_sha1(input_path)
+        fresh = entry is not None and entry["sha1"] == digest
+        new_entry = {"sha1": digest, "size": size, "mtime": mtime}
+        # dHashes alter Größe verwerfen, damit --collapse sie neu berechnet
+        if fresh and len(entry.get("dhash", "")) == DHASH_SIZE * DHASH_SIZE // 4:
+            new_entry["dhash"] = entry["dhash"]
+
+        if DEDUP and digest in seen:
+            new_entry["same_as"] = seen[digest]
+            cache[fname] = new_entry
+            continue
+        seen[digest] = fname
+        cache[fname] = new_entry
 
-        # Markdown Eintrag
-        if PIL_AVAILABLE and thumb_path and os.path.exists(thumb_path):
-            md_line = f'<a href="screenshots/{fname}"><img src="thumbnails/{fname}" width="{THUMB_WIDTH}" style="border: 3px solid #333; border-radius: 8px; display: block;"></a>'
+        complete = all(name in existing for name, *_ in thumbnail_variants(fname))
+        if complete:
+            if fresh and "same_as" not in entry:
+                continue
+            # Thumbnail von vor dem Cache: übernehmen, wenn es jünger als die Quelle ist
+            if legacy and existing[fname] >= mtime * 1e9:
+                continue
+            if entry:
+                log(f"[STALE] Thumbnail veraltet: {thumb_path}", step=step["name"])
+
+        # Neue (neuere) Kopie eines Bildes mit Thumbnails → Varianten übernehmen statt neu dekodieren
+        donor = local.get(digest)
+        if donor and donor != fname and copy_shared_thumbnail((thumbs, donor), thumbs, fname, existing):
+            log(f"[REUSE] Thumbnail übernommen von {donor}: {fname}", step=step["name"])
+            if len(old_cache[donor].get("dhash", "")) == DHASH_SIZE * DHASH_SIZE // 4:
+                new_entry.setdefault("dhash", old_cache[donor]["dhash"])
+            continue
+        source = find_shared(digest) if find_shared else None
+        if source and source[0] != thumbs and copy_shared_thumbnail(source, thumbs, fname, existing):
+            log(f"[REUSE] Thumbnail übernommen aus {os.path.basename(os.path.dirname(source[0]))}: {fname}",
+                step=step["name"])
+            continue
+        jobs.append((input_path, thumbnail_outputs(thumb_path)))
+
+    # Waisen entfernen (Thumbnail ohne Screenshot, abgeschaltete Größe/Format, Duplikat);
+    # Kontaktbögen bleiben, solange --sheets aktiv ist – überzählige räumt write_contact_sheets() auf
+    names = {name for fname, entry in cache.items() if "same_as" not in entry
+             for name, *_ in thumbnail_variants(fname)}
+    keep_sheets = SHEETS and files
+    orphans = [f for f in existing if f not in names and not (keep_sheets and SHEET_FILE_PATTERN.match(f))]
+    for f in orphans:
+        os.remove(os.path.join(thumbs, f))
+        del existing[f]
+        log(f"[EVICT] Verwaistes Thumbnail gelöscht: {os.path.join(thumbs, f)}", step=step["name"])
+    sheet_cache = os.path.join(thumbs, SHEET_CACHE_FILE)
+    if not keep_sheets and any(SHEET_FILE_PATTERN.match(f) for f in orphans) and os.path.exists(sheet_cache):
+        os.remove(sheet_cache)
+
+    return jobs, cache
+
+def commit_thumb_cache(step, jobs, cache, failed, dhashes=None):
+    """Trägt neue Thumbnails ins Step-Modell ein und speichert den Cache.
+
+    dhashes (aus generate_thumbnails) landen im Cache; bei --collapse werden
+    fehlende dHashes einmalig nachberechnet. Der Cache bleibt als
+    step["thumbcache"] für render_screenshots() am Step.
+    """
+    if not pil_installed():
+        return
+    thumbs = os.path.join(step["path"], "thumbnails")
+    screenshots = os.path.join(step["path"], "screenshots")
+    dhashes = dhashes or {}
+    for input_path, outputs in jobs:
+        if input_path in failed:
+            cache.pop(os.path.basename(input_path), None)
         else:
-            md_line = f"- [{fname}](screenshots/{fname})"
+            for thumb_path, *_ in outputs:
+                step["thumbnails"][os.path.basename(thumb_path)] = _mtime_ns(thumb_path)
+            if input_path in dhashes:
+                cache[os.path.basename(input_path)]["dhash"] = dhashes[input_path]
+    if DEDUP_COLLAPSE:
+        for fname, entry in cache.items():
+            if "dhash" not in entry:
+                try:
+                    entry["dhash"] = image_dhash(os.path.join(screenshots, fname))
+                except Exception as e:
+                    log(f"[WARN] dHash nicht berechenbar: {fname} → {e}", step=step["name"])
+    step["thumbcache"] = cache
+    if step["thumbnails_dir"] is not None and cache != load_thumb_cache(thumbs):
+        save_thumb_cache(thumbs, cache)
 
-        current_page.append(md_line)
+# =====================================================================
+# Update Screenshots für EINEN Step
+# =====================================================================
+
+def collect_screenshots(step):
+    """Bereitet thumbnails/ vor und gibt die Bilder des Steps sortiert zurück"""
+    folder_path = step["path"]
+    thumbs = os.path.join(folder_path, "thumbnails")
 
-        # Pagination
-        if len(current_page) == PER_PAGE:
-            md_pages.append(current_page)
-            current_page = []
+    if step["screenshots_dir"] is None:
+        log(f"[SKIP] Kein screenshot-Ordner in {folder_path}", step=step["name"])
+        return []
 
-    if current_page:
-        md_pages.append(current_page)
+    if step["screenshots"] is None:
+        scan_step_images(step)
+
+    if pil_installed() and step["thumbnails_dir"] is None and step["screenshots"]:
+        os.makedirs(thumbs)
+        step["thumbnails_dir"] = _mtime_ns(thumbs)
+        log(f"[CREATE] thumbnails/ erstellt in {folder_path}", step=step["name"])
+
+    # Neueste zuerst
+    return sorted(step["screenshots"], key=lambda x: x[1], reverse=True)
+
+def _srcset(variants):
+    """srcset-Attribut aus [(name, scale)]; leer bei nur einer Größe"""
+    if len(variants) < 2:
+        return ""
+    return ' srcset="' + ", ".join(f"thumbnails/{name} {scale}x" for name, scale in variants) + '"'
+
+def thumbnail_markup(fname, thumbnails):
+    """<img> (mit srcset für 2x, ggf. in <picture> mit WebP) für einen Screenshot.
+
+    Nur tatsächlich vorhandene Varianten landen im Markup; ohne Zusatzgrößen
+    und ohne WebP bleibt es das bisherige einfache <img>.
+    """
+    plain, webp = [], []
+    for name, scale, fmt in thumbnail_variants(fname):
+        if name in thumbnails:
+            (webp if fmt == "WEBP" else plain).append((name, scale))
+    img = f'<img src="thumbnails/{fname}"{_srcset(plain)} width="{THUMB_WIDTH}" style="border: 3px solid #333; border-radius: 8px; display: block;">'
+    if not webp:
+        return img
+    srcset = ", ".join(f"thumbnails/{name} {scale}x" for name, scale in webp)
+    return f'<picture><source type="image/webp" srcset="{srcset}">{img}</picture>'
+
+def page_file_name(number):
+    """Dateiname einer ausgelagerten Galerie-Seite (ab Seite 2)"""
+    return PAGE_FILE.format(number)
+
+def render_page_file(step, number, total, page):
+    """Markdown einer ausgelagerten Seite.
+
+    Die Navigation nennt nur Vorgänger, Übersicht und Nachfolger, damit eine
+    neue letzte Seite nicht alle anderen Dateien umschreibt.
+    """
+    nav_links = []
+    if number > 2:
+        nav_links.append(f"[← Seite {number-1}]({page_file_name(number-1)})")
+    nav_links.append("[Seite 1 / Übersicht](README.md#-screenshots)")
+    if number < total:
+        nav_links.append(f"[Seite {number+1} →]({page_file_name(number+1)})")
+
+    md = [f"# {step['name']} – Screenshots Seite {number}", ""]
+    md.append("**Gehe zu:** " + " | ".join(nav_links))
+    md.append("")
+    md.extend(page)
+    md.append("")
+    return "\n".join(md)
+
+def write_page_files(step, page_files):
+    """Schreibt ausgelagerte Seiten (nur geänderte) und löscht überzählige.
+
+    Gibt die Anzahl neu geschriebener Dateien zurück.
+    """
+    written = 0
+    for name, content in page_files.items():
+        if write_if_changed(os.path.join(step["path"], name), content):
+            written += 1
+            log(f"[UPDATE] {name} aktualisiert in {step['name']}", step=step["name"])
+    for name in step["pages"]:
+        if name not in page_files:
+            os.remove(os.path.join(step["path"], name))
+            log(f"[EVICT] Überzählige Seite gelöscht: {name} in {step['name']}", step=step["name"])
+    step["pages"] = sorted(page_files)
+    return written
+
+def group_similar(files, entries):
+    """[(Screenshot, [zusammengefasste ähnliche])] in Galerie-Reihenfolge.
+
+    Ohne DEDUP_COLLAPSE bleibt jedes Bild einzeln. Sonst wird ein Bild dem
+    ersten (neueren) zugeordnet, dessen dHash höchstens DHASH_DISTANCE Bits
+    abweicht; inhaltsgleiche Kopien gehören immer zu ihrem Original.
+    Strukturarme Bilder (siehe dhash_comparable) werden nie zusammengefasst.
+    """
+    groups = []
+    if not DEDUP_COLLAPSE:
+        return [(fname, []) for fname, *_ in files]
+    kept = []       # (dHash, Gruppe)
+    group_of = {}   # Screenshot → Gruppe
+    for fname, *_ in files:
+        entry = entries.get(fname, {})
+        original = group_of.get(entry.get("same_as"))
+        if original:
+            original[1].append(fname)
+            group_of[fname] = original
+            continue
+        dhash = entry.get("dhash")
+        comparable = dhash_comparable(dhash)
+        for kept_hash, group in kept:
+            if comparable and hamming(dhash, kept_hash) <= DHASH_DISTANCE:
+                group[1].append(fname)
+                break
+        else:
+            group = (fname, [])
+            groups.append(group)
+            if comparable:
+                kept.append((dhash, group))
+        group_of[fname] = group
+    return groups
+
+def gallery_line(fname, thumb, similar, thumbnails):
+    """Markdown eines Galerie-Eintrags (Thumbnail-Link oder einfacher Link)"""
+    if thumb:
+        md_line = f'<a href="screenshots/{fname}">{thumbnail_markup(thumb, thumbnails)}</a>'
+    else:
+        md_line = f"- [{fname}](screenshots/{fname})"
+    if similar:
+        md_line += f"\n<sub>+{len(similar)} ähnlich: {_similar_links(similar)}</sub>"
+    return md_line
+
+def _similar_links(similar):
+    return ", ".join(f'<a href="screenshots/{name}">{name}</a>' for name in similar)
+
+# =====================================================================
+# Kontaktbögen (--sheets): eine Bilddatei pro Galerie-Seite
+# =====================================================================
+
+def sheet_key(chunk, entries, scale):
+    """Inhalts-Schlüssel eines Bogens: Reihenfolge, Thumbnails und Bild-Hashes"""
+    import hashlib
+    members = [[fname, thumb, entries.get(thumb, {}).get("sha1")] for fname, thumb, _ in chunk if thumb]
+    payload = repr((THUMB_WIDTH, scale, SHEET_COLUMNS, SHEET_GAP, members))
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+def _sheet_font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:   # Pillow < 10.1: nur die feste Bitmap-Schrift
+        return ImageFont.load_default()
+
+def render_contact_sheet(thumbs, tiles, output_path, scale):
+    """Setzt die Thumbnails eines Bogens zu einem PNG zusammen.
+
+    tiles ist [(Thumbnail-Name)] in Galerie-Reihenfolge; die Kacheln werden
+    nummeriert (Bezug für die Linkliste unter dem Bogen). Für HiDPI wird aus
+    den @2x-Varianten gebaut und per width-Attribut halb so groß angezeigt.
+    Gibt die Rechtecke [x1, y1, x2, y2] in 1x-Pixeln und die Bogengröße zurück.
+    """
+    from PIL import ImageDraw
+    Image = pil_image()
+    images = []
+    for thumb in tiles:
+        stem, ext = os.path.splitext(thumb)
+        name = thumb if scale == 1 else f"{stem}@{scale}x{ext}"
+        path = os.path.join(thumbs, name)
+        with Image.open(path if os.path.exists(path) else os.path.join(thumbs, thumb)) as img:
+            tile = img.convert("RGBA")
+        if tile.width != THUMB_WIDTH * scale:
+            tile = tile.resize((THUMB_WIDTH * scale, max(1, round(tile.height * THUMB_WIDTH * scale / tile.width))))
+        images.append(tile)
+
+    rects = []
+    x = y = row_height = 0
+    for i, tile in enumerate(images):
+        if i and i % SHEET_COLUMNS == 0:
+            x, y, row_height = 0, y + row_height + SHEET_GAP, 0
+        height = -(-tile.height // scale)
+        rects.append([x, y, x + THUMB_WIDTH, y + height])
+        row_height = max(row_height, height)
+        x += THUMB_WIDTH + SHEET_GAP
+    width = min(len(images), SHEET_COLUMNS) * (THUMB_WIDTH + SHEET_GAP) - SHEET_GAP
+    size = (width, y + row_height)
+
+    sheet = Image.new("RGBA", (size[0] * scale, size[1] * scale), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(sheet)
+    font = _sheet_font(12 * scale)
+    for number, (tile, (x1, y1, x2, y2)) in enumerate(zip(images, rects), start=1):
+        box = (x1 * scale, y1 * scale, x2 * scale - 1, y1 * scale + tile.height - 1)
+        sheet.paste(tile, box[:2])
+        draw.rectangle(box, outline=(51, 51, 51, 255), width=3 * scale)
+        label = (box[0] + 3 * scale, box[1] + 3 * scale)
+        draw.rectangle((*label, label[0] + 22 * scale, label[1] + 16 * scale), fill=(51, 51, 51, 255))
+        draw.text((label[0] + 3 * scale, label[1] + 1 * scale), str(number), fill=(255, 255, 255, 255), font=font)
+    sheet.save(output_path, optimize=True)
+    return rects, size
+
+def contact_sheet_markup(number, name, chunk, rects, size):
+    """Bogen als <img> mit Image-Map plus nummerierte Linkliste als Fallback.
+
+    Manche Markdown-Renderer (z.B. GitHub) entfernen <map>; die Liste
+    darunter führt dann über die Kachelnummern zu den Screenshots.
+    """
+    map_name = f"sheet-{number}"
+    tiles = [(fname, similar) for fname, thumb, similar in chunk if thumb]
+    lines = [f'<img src="thumbnails/{name}" width="{size[0]}" usemap="#{map_name}" '
+             f'alt="Screenshots Seite {number}">',
+             f'<map name="{map_name}">']
+    for (fname, _), (x1, y1, x2, y2) in zip(tiles, rects):
+        lines.append(f'<area shape="rect" coords="{x1},{y1},{x2},{y2}" href="screenshots/{fname}" '
+                     f'alt="{fname}" title="{fname}">')
+    lines.append("</map>")
+    lines.append("")
+
+    links = []
+    for tile_number, (fname, similar) in enumerate(tiles, start=1):
+        link = f'{tile_number}: <a href="screenshots/{fname}">{fname}</a>'
+        if similar:
+            link += f" (+{len(similar)} ähnlich: {_similar_links(similar)})"
+        links.append(link)
+    # Einträge ohne Thumbnail (z.B. Fehler beim Erzeugen) nur als Link
+    links.extend(f'<a href="screenshots/{fname}">{fname}</a>' for fname, thumb, _ in chunk if not thumb)
+    lines.append("<sub>" + " · ".join(links) + "</sub>")
+    return "\n".join(lines)
+
+def write_contact_sheets(step, chunks):
+    """Baut pro Seite einen Kontaktbogen in thumbnails/ und gibt das Markdown je Seite zurück.
+
+    Ein Bogen wird nur neu gezeichnet, wenn sich seine Mitglieder (Reihenfolge
+    oder Bildinhalt) ändern; Schlüssel und Kachel-Rechtecke stehen in
+    thumbnails/.sheetcache.json. Überzählige Bögen werden gelöscht.
+    """
+    import json
+    thumbs = os.path.join(step["path"], "thumbnails")
+    thumbnails = step["thumbnails"]
+    entries = step.get("thumbcache") or {}
+    cache_path = os.path.join(thumbs, SHEET_CACHE_FILE)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            old_cache = json.load(f)
+    except (OSError, ValueError):
+        old_cache = {}
+    scale = max(THUMB_SCALES)
+
+    cache = {}
+    blocks = []
+    for number, chunk in enumerate(chunks, start=1):
+        name = SHEET_FILE.format(number)
+        tiles = [thumb for _, thumb, _ in chunk if thumb]
+        if not tiles:
+            blocks.append("\n".join(gallery_line(fname, None, similar, thumbnails) for fname, _, similar in chunk))
+            continue
+        key = sheet_key(chunk, entries, scale)
+        entry = old_cache.get(name)
+        if not (entry and entry["key"] == key and name in thumbnails):
+            rects, size = render_contact_sheet(thumbs, tiles, os.path.join(thumbs, name), scale)
+            entry = {"key": key, "rects": rects, "size": list(size)}
+            thumbnails[name] = _mtime_ns(os.path.join(thumbs, name))
+            log(f"[SHEET] Kontaktbogen {name} erzeugt ({len(tiles)} Bilder)", step=step["name"])
+        cache[name] = entry
+        blocks.append(contact_sheet_markup(number, name, chunk, entry["rects"], entry["size"]))
+
+    for f in [f for f in thumbnails if SHEET_FILE_PATTERN.match(f) and f not in cache]:
+        os.remove(os.path.join(thumbs, f))
+        del thumbnails[f]
+        log(f"[EVICT] Überzähliger Kontaktbogen gelöscht: {f}", step=step["name"])
+    if cache != old_cache:
+        write_text_atomic(cache_path, json.dumps(cache, indent=1, sort_keys=True))
+    return blocks
+
+def render_screenshots(step, files):
+    """Baut das Screenshot-Markdown für bereits sortierte Bilder.
+
+    Gibt (README-Markdown, {Dateiname: Inhalt}) zurück. Das Dict ist nur
+    bei SPLIT_PAGES und mehr als einer Seite gefüllt: Seite 1 steht dann
+    in der README, alle weiteren in screenshots_page_N.md.
+    Mit SHEETS wird jede Seite ein Kontaktbogen (schreibt ggf. thumbnails/).
+    """
+    thumbnails = step["thumbnails"] or {}
+    entries = step.get("thumbcache") or {}
+
+    items = []
+    for fname, similar in group_similar(files, entries):
+        # Duplikate (--dedup) zeigen das Thumbnail des ersten gleichen Bildes
+        thumb = entries.get(fname, {}).get("same_as", fname)
+        items.append((fname, thumb if pil_installed() and thumb in thumbnails else None, similar))
+
+    # Pagination
+    chunks = [items[i:i + PER_PAGE] for i in range(0, len(items), PER_PAGE)]
+    if SHEETS and pil_installed():
+        md_pages = [[block] for block in write_contact_sheets(step, chunks)]
+    else:
+        md_pages = [[gallery_line(fname, thumb, similar, thumbnails) for fname, thumb, similar in chunk]
+                    for chunk in chunks]
 
     # Markdown zusammenbauen
     md_final = []
 
+    page_files = {}
+
     if len(md_pages) == 1:
         md_final.extend(md_pages[0])
+    elif SPLIT_PAGES:
+        total = len(md_pages)
+        for number, page in enumerate(md_pages[1:], start=2):
+            page_files[page_file_name(number)] = render_page_file(step, number, total, page)
+        md_final.extend(md_pages[0])
+        md_final.append("")
+        md_final.append("**Weitere Seiten:** " + " | ".join(
+            f"[Seite {number}]({name})" for number, name in enumerate(page_files, start=2)))
     else:
         for current, page in enumerate(md_pages):
             nav_links = []
@@ -368,59 +1754,495 @@ def update_screenshots(folder_path):
             md_final.extend(page)
             md_final.append("")
 
-    return "\n".join(md_final)
+    return "\n".join(md_final), page_files
+
+def update_screenshots(folder_path, step=None, jobs=1):
+    """Aktualisiert die Screenshot-Liste in einem Step-Ordner"""
+    require_pil()
+    if step is None:
+        step = scan_step(folder_path)
+    name = step["name"]
+    if step["screenshots"] is None:
+        with phase("list", name):
+            scan_step_images(step)
+
+    files = collect_screenshots(step)
+    with phase("plan", name):
+        thumb_jobs, cache = plan_thumbnails(step, files)
+    if not files:
+        write_page_files(step, {})
+        return "- Noch keine Screenshots"
+
+    # Thumbnails erzeugen & Markdown erstellen
+    failed, _, dhashes = generate_thumbnails(thumb_jobs, jobs)
+    commit_thumb_cache(step, thumb_jobs, cache, failed, dhashes)
+    with phase("render", name):
+        md, page_files = render_screenshots(step, files)
+    write_page_files(step, page_files)
+    return md
+
+# =====================================================================
+# Manifest (inkrementeller Update-Modus)
+# =====================================================================
+
+def manifest_path():
+    """Pfad zum Manifest unter ROOT_DIR"""
+    return os.path.join(ROOT_DIR, MANIFEST_FILE)
+
+def manifest_config():
+    """Einstellungen, die das generierte Markdown beeinflussen"""
+    return {
+        "thumb_width": THUMB_WIDTH,
+        "thumb_scales": list(THUMB_SCALES),
+        "thumb_webp": THUMB_WEBP,
+        "per_page": PER_PAGE,
+        "split_pages": SPLIT_PAGES,
+        "dedup": DEDUP,
+        "collapse": [DHASH_SIZE, DHASH_DISTANCE, DHASH_MIN_BITS] if DEDUP_COLLAPSE else False,
+        "sheets": SHEETS,
+        "pil": pil_installed(),
+    }
+
+def load_manifest():
+    """Lädt das Manifest; bei Fehlern oder anderer Version ein leeres"""
+    import json
+    empty = {"version": MANIFEST_VERSION, "config": manifest_config(), "steps": {}}
+    path = manifest_path()
+    if not os.path.exists(path):
+        return empty
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError) as e:
+        log(f"[WARN] Manifest unlesbar, wird neu aufgebaut: {e}")
+        return empty
+    if manifest.get("version") != MANIFEST_VERSION:
+        return empty
+    if manifest.get("config") != manifest_config():
+        log("[INFO] Einstellungen geändert, Manifest wird neu aufgebaut")
+        return empty
+    return manifest
+
+def save_manifest(manifest):
+    """Schreibt das Manifest nach ROOT_DIR"""
+    import json
+    write_text_atomic(manifest_path(), json.dumps(manifest, indent=1, sort_keys=True))
+
+# =====================================================================
+# README: Screenshot-Abschnitt ersetzen
+# =====================================================================
+
+def splice_screenshots(readme, md):
+    """Ersetzt alles ab "## 📸 Screenshots" durch md.
+
+    Gibt "rewritten", "skipped" (Abschnitt schon identisch) oder None
+    (README ohne Screenshot-Überschrift) zurück.
+    """
+    with open(readme, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    if "## 📸 Screenshots" not in content:
+        return None
+
+    pre, _ = content.split("## 📸 Screenshots", 1)
+    new_content = pre + "## 📸 Screenshots\n\n" + md
+    if new_content == content:
+        return "skipped"
+
+    write_text_atomic(readme, new_content)
+    return "rewritten"
+
+def _mtime_ns(path):
+    """mtime in Nanosekunden oder None, falls der Pfad fehlt"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+# =====================================================================
+# Portfolio-Index (cpp_mastery/INDEX.md)
+# =====================================================================
+
+# Jede Zeile wird aus Daten gebaut, die update_all() ohnehin erfasst, und
+# im Manifest gemerkt. Unveränderte Steps liefern ihre Zeile von dort –
+# für den Index wird keine README gelesen.
+
+def index_path():
+    """Pfad zum Portfolio-Index unter ROOT_DIR"""
+    return os.path.join(ROOT_DIR, INDEX_FILE)
+
+def load_step_titles():
+    """Ordner → Titel aus dem Step-Index (ohne STEPS_DIR neu einzulesen)"""
+    import json
+    try:
+        with open(step_index_path(), "r", encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return {entry["folder"]: entry["title"]
+            for entries in index.get("steps", {}).values() for entry in entries}
+
+def index_row(step, files, titles):
+    """Index-Zeile eines Steps: Nummer, Titel, Anzahl, neuester Screenshot, Änderungszeit"""
+    parsed = parse_step_folder(step["name"])
+    number, slug = parsed if parsed else (None, step["name"])
+    latest = None
+    modified = step["readme"][0] / 1e9 if step["readme"] else 0
+    if files:
+        # files ist schon sortiert (neueste zuerst)
+        name, mtime, _ = files[0]
+        thumbnails = step["thumbnails"] or {}
+        latest = f"thumbnails/{name}" if name in thumbnails else f"screenshots/{name}"
+        modified = max(modified, mtime)
+    return {
+        "number": number,
+        "title": titles.get(step["name"], slug.replace("-", " ")),
+        "screenshots": len(files),
+        "latest": latest,
+        "modified": datetime.fromtimestamp(modified).strftime("%Y-%m-%d %H:%M") if modified else None,
+    }
+
+def render_index(steps):
+    """Baut INDEX.md aus den Manifest-Einträgen {Ordner: {..., "row": {...}}}"""
+    total = sum(entry["row"]["screenshots"] for entry in steps.values())
+    md = [
+        "# 📚 C++ Mastery – Portfolio",
+        "",
+        f"{len(steps)} Steps, {total} Screenshots",
+        "",
+        "| Nr. | Step | Screenshots | Neuester | Geändert |",
+        "|----:|------|------------:|----------|----------|",
+    ]
+    # Nach Step-Nummer, nicht nach Ordnername (sonst step_100 vor step_10)
+    order = sorted(steps, key=lambda folder: (steps[folder]["row"]["number"] is None,
+                                              steps[folder]["row"]["number"] or 0, folder))
+    for folder in order:
+        row = steps[folder]["row"]
+        number = format_step_number(row["number"]) if row["number"] is not None else "–"
+        title = row["title"].replace("|", "\\|")
+        link = f"[{title}](steps/{folder}/README.md)"
+        latest = "–"
+        if row["latest"]:
+            latest = f'<a href="steps/{folder}/README.md"><img src="steps/{folder}/{row["latest"]}" width="{THUMB_WIDTH // 2}"></a>'
+        md.append(f"| {number} | {link} | {row['screenshots']} | {latest} | {row['modified'] or '–'} |")
+    md.append("")
+    return "\n".join(md)
 
 # =====================================================================
 # Update ALLE Steps
 # =====================================================================
 
-def update_all():
-    """Aktualisiert alle Step-Ordner"""
+def update_all(full=False, jobs=None, only=None):
+    """Aktualisiert alle Step-Ordner (inkrementell über das Manifest).
+
+    only: optionale Menge von Step-Ordnernamen (Watch-Modus). Diese Steps
+    werden ohne Fingerabdruck-Vergleich neu verarbeitet, alle anderen
+    bleiben unangetastet im Manifest stehen.
+    """
+    import hashlib
     updated = 0
+    skipped = 0
+    unchanged = 0
+    require_pil()
 
     if not os.path.exists(STEPS_DIR):
         print(f"❌ Ordner nicht gefunden: {STEPS_DIR}")
         log(f"[ERROR] STEPS_DIR nicht gefunden: {STEPS_DIR}")
         return
 
-    step_folders = [f for f in os.listdir(STEPS_DIR) if f.startswith("step_")]
-    if not step_folders:
+    with phase("scan"):
+        if only is None:
+            steps = scan_steps()
+        else:
+            steps = [scan_step(os.path.join(STEPS_DIR, name)) for name in sorted(only)
+                     if os.path.isdir(os.path.join(STEPS_DIR, name))]
+    if not steps and only is None:
         print("ℹ️  Keine step_XX Ordner gefunden. Nichts zu aktualisieren.")
         log("[SKIP] Keine Step-Ordner vorhanden.")
         return
 
-    for folder in step_folders:
-        folder_path = os.path.join(STEPS_DIR, folder)
-        readme = os.path.join(folder_path, "README.md")
+    if only is None:
+        update_superbuild(steps)
+
+    manifest = load_manifest()
+    old_steps = {} if full else manifest["steps"]
+    new_steps = {}
+    if only is not None:
+        new_steps = {name: entry for name, entry in manifest["steps"].items() if name not in only}
+
+    # --dedup=global: Hash-Index aller Steps erst laden, wenn er gebraucht wird
+    shared_index = None
+
+    def find_shared(digest):
+        nonlocal shared_index
+        if shared_index is None:
+            shared_index = load_shared_thumbs()
+        return shared_index.get(digest)
+
+    shared = find_shared if DEDUP == "global" else None
+
+    # Phase 1: geänderte Steps finden und fehlende Thumbnails sammeln
+    pending = []
+    thumb_jobs = []
+    for step in steps:
+        folder = step["name"]
+
+        # Nichts geändert → Step komplett überspringen
+        entry = old_steps.get(folder)
+        if (only is None and entry and entry["fingerprint"] == fingerprint(step)
+                and entry["screenshots"] == screenshot_stats(step)):
+            new_steps[folder] = entry
+            unchanged += 1
+            continue
 
-        if not os.path.exists(readme):
-            log(f"[SKIP] Kein README in {folder_path}")
+        if step["readme"] is None:
+            log(f"[SKIP] Kein README in {step['path']}", step=folder)
             continue
 
-        screenshots = os.path.join(folder_path, "screenshots")
-        if not os.path.exists(screenshots) or not os.listdir(screenshots):
-            md = "- Noch keine Screenshots"
+        with phase("list", folder):
+            scan_step_images(step, reuse=True)
+        files = collect_screenshots(step) if step["screenshots"] else []
+        # Auch ohne Screenshots, damit verwaiste Thumbnails verschwinden
+        with phase("plan", folder):
+            step_jobs, cache = plan_thumbnails(step, files, shared)
+        thumb_jobs.extend(step_jobs)
+        pending.append((step, files, entry, step_jobs, cache))
+
+    # Phase 2: alle Thumbnails auf einmal (parallel) erzeugen
+    failed, fast, dhashes = set(), 0, {}
+    if thumb_jobs:
+        failed, fast, dhashes = generate_thumbnails(thumb_jobs, jobs)
+        log(f"[THUMBS] {len(thumb_jobs) - len(failed)}/{len(thumb_jobs)} Thumbnails erzeugt, "
+            f"{fast} per Schnellpfad")
+
+    # Phase 3: Markdown bauen und READMEs ersetzen
+    titles = load_step_titles() if pending else {}
+    for step, files, entry, step_jobs, cache in pending:
+        folder = step["name"]
+        folder_path = step["path"]
+        readme = os.path.join(folder_path, "README.md")
+        commit_thumb_cache(step, step_jobs, cache, failed, dhashes)
+        with phase("render", folder):
+            md, page_files = render_screenshots(step, files) if files else ("- Noch keine Screenshots", {})
+        md_hash = hashlib.sha1(md.encode("utf-8"))
+        for name in sorted(page_files):
+            md_hash.update(page_files[name].encode("utf-8"))
+        md_hash = md_hash.hexdigest()
+
+        # README ersetzen – nur wenn sich das Markdown oder die README geändert hat
+        # (oder eine ausgelagerte Seite fehlt bzw. übrig ist)
+        if (entry and entry["md_hash"] == md_hash and entry["fingerprint"]["readme"] == step["readme"]
+                and step["pages"] == sorted(page_files)):
+            skipped += 1
         else:
-            md = update_screenshots(folder_path)
-            if md is None:
-                continue
+            with phase("readme", folder):
+                result = splice_screenshots(readme, md)
+                write_page_files(step, page_files)
+            if result == "rewritten":
+                updated += 1
+                log(f"[UPDATE] README aktualisiert in {folder}", step=folder)
+            elif result == "skipped":
+                skipped += 1
+
+        # Nach dem Schreiben neu erfassen, damit der nächste Lauf sauber vergleicht
+        new_steps[folder] = {
+            "fingerprint": step_fingerprint(folder_path),
+            "screenshots": {name: [size, mtime] for name, mtime, size in files},
+            "md_hash": md_hash,
+            "row": index_row(step, files, titles),
+        }
 
-        # README ersetzen
-        with open(readme, "r", encoding="utf-8") as f:
-            content = f.read()
+    index_changed = new_steps != manifest["steps"]
+    if index_changed:
+        manifest["steps"] = new_steps
+        with phase("manifest"):
+            save_manifest(manifest)
+    if index_changed or not os.path.exists(index_path()):
+        with phase("index"):
+            if write_if_changed(index_path(), render_index(new_steps)):
+                log(f"[PORTFOLIO] {INDEX_FILE} aktualisiert ({len(new_steps)} Steps)")
+
+    print(f"✔ UPDATE abgeschlossen. {updated} READMEs neu geschrieben, "
+          f"{skipped} übersprungen (identisch), {unchanged} Ordner unverändert.")
+    if thumb_jobs:
+        print(f"🖼️  {len(thumb_jobs) - len(failed)} Thumbnails erzeugt "
+              f"({fast} per Schnellpfad mit reduzierter Auflösung dekodiert)")
+    log(f"[DONE] Update abgeschlossen: {updated} (übersprungen: {skipped}, unverändert: {unchanged})")
 
-        if "## 📸 Screenshots" in content:
-            pre, _ = content.split("## 📸 Screenshots", 1)
-            new_content = pre + "## 📸 Screenshots\n\n" + md
+# =====================================================================
+# WATCH: Galerien aktualisieren, sobald Screenshots landen
+# =====================================================================
 
-            with open(readme, "w", encoding="utf-8") as f:
-                f.write(new_content)
+WATCH_DEBOUNCE = 0.5        # Sekunden Ruhe, bevor ein Schwung Events verarbeitet wird
+WATCH_POLL_INTERVAL = 1.0   # Sekunden zwischen zwei Scans im Polling-Modus
+
+# inotify-Konstanten aus <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+
+_DIR_MASK = _IN_CREATE | _IN_MOVED_TO | _IN_DELETE | _IN_MOVED_FROM | _IN_ONLYDIR
+_SHOT_MASK = _DIR_MASK | _IN_CLOSE_WRITE | _IN_DELETE_SELF
+
+def _open_inotify():
+    """Öffnet eine inotify-Instanz über ctypes; None, wenn nicht verfügbar"""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        fd = libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    return libc, fd
+
+def _read_inotify_events(fd, timeout):
+    """Wartet bis timeout (None = ewig) und liefert [(wd, mask, name), ...]"""
+    import select
+    import struct
+    ready, _, _ = select.select([fd], [], [], timeout)
+    if not ready:
+        return []
+    try:
+        data = os.read(fd, 64 * 1024)
+    except BlockingIOError:
+        return []
+    events = []
+    offset = 0
+    header = struct.calcsize("iIII")
+    while offset + header <= len(data):
+        wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+        name = data[offset + header:offset + header + length].rstrip(b"\0")
+        events.append((wd, mask, os.fsdecode(name)))
+        offset += header + length
+    return events
+
+def _watch_inotify(libc, fd, jobs):
+    """Event-Schleife mit inotify: STEPS_DIR, jeder Step und sein screenshots/"""
+    watches = {}    # wd → (Art, Step-Pfad)
+
+    def add_watch(path, kind, step_path, mask):
+        wd = libc.inotify_add_watch(fd, os.fsencode(path), mask)
+        if wd >= 0:
+            watches[wd] = (kind, step_path)
+
+    def add_step(step_path):
+        add_watch(step_path, "step", step_path, _DIR_MASK)
+        screenshots = os.path.join(step_path, "screenshots")
+        if os.path.isdir(screenshots):
+            add_watch(screenshots, "screenshots", step_path, _SHOT_MASK)
+
+    add_watch(STEPS_DIR, "steps", None, _DIR_MASK)
+    for step in scan_steps():
+        add_step(step["path"])
+
+    pending = set()
+    deadline = None
+    while True:
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        events = _read_inotify_events(fd, timeout)
+
+        for wd, mask, name in events:
+            if mask & _IN_Q_OVERFLOW:
+                pending.update(step["name"] for step in scan_steps())
+                continue
+            if mask & _IN_IGNORED:
+                watches.pop(wd, None)
+                continue
+            kind, step_path = watches.get(wd, (None, None))
+            is_new = mask & (_IN_CREATE | _IN_MOVED_TO)
+
+            if kind == "steps":
+                # Neuer Step (z. B. per init_step() angelegt)
+                if name.startswith("step_") and mask & _IN_ISDIR:
+                    if is_new:
+                        add_step(os.path.join(STEPS_DIR, name))
+                    pending.add(name)
+            elif kind == "step":
+                # screenshots/ nachträglich angelegt, README frisch erzeugt
+                if name == "screenshots" and mask & _IN_ISDIR and is_new:
+                    add_watch(os.path.join(step_path, name), "screenshots", step_path, _SHOT_MASK)
+                    pending.add(os.path.basename(step_path))
+                elif name == "README.md" and mask & _IN_CREATE:
+                    pending.add(os.path.basename(step_path))
+            elif kind == "screenshots":
+                if mask & _IN_DELETE_SELF or os.path.splitext(name)[1].lower() in IMAGE_EXTENSIONS:
+                    pending.add(os.path.basename(step_path))
+
+        if events:
+            if pending:
+                deadline = time.monotonic() + WATCH_DEBOUNCE
+        elif pending and deadline is not None and time.monotonic() >= deadline:
+            update_all(jobs=jobs, only=pending)
+            flush_log()
+            pending = set()
+            deadline = None
+
+def _watch_polling(jobs):
+    """Fallback ohne inotify: vergleicht regelmäßig Step-Fingerabdrücke und Screenshot-Stats"""
+    def snapshot():
+        if not os.path.exists(STEPS_DIR):
+            return {}
+        return {step["name"]: (fingerprint(step), screenshot_stats(step)) for step in scan_steps()}
+
+    known = snapshot()
+    pending = set()
+    deadline = None
+    while True:
+        time.sleep(WATCH_POLL_INTERVAL)
+        current = snapshot()
+        changed = {name for name, fp in current.items() if known.get(name) != fp}
+        # Gelöschte Steps ebenfalls melden, damit Manifest und INDEX.md sie verlieren
+        changed |= set(known) - set(current)
+        known = current
+
+        if changed:
+            pending |= changed
+            deadline = time.monotonic() + WATCH_DEBOUNCE
+        elif pending and time.monotonic() >= deadline:
+            update_all(jobs=jobs, only=pending)
+            flush_log()
+            pending = set()
+            # Eigene Schreibzugriffe nicht als neue Änderung werten
+            known = snapshot()
+
+def watch_steps(jobs=None):
+    """Überwacht STEPS_DIR und aktualisiert nur die betroffenen Steps"""
+    if not os.path.exists(STEPS_DIR):
+        print(f"❌ Ordner nicht gefunden: {STEPS_DIR}")
+        log(f"[ERROR] STEPS_DIR nicht gefunden: {STEPS_DIR}")
+        return
 
-            updated += 1
-            log(f"[UPDATE] README aktualisiert in {folder}")
+    update_all(jobs=jobs)
+    flush_log()
 
-    print(f"✔ UPDATE abgeschlossen. {updated} Ordner aktualisiert.")
-    log(f"[DONE] Update abgeschlossen: {updated}")
+    inotify = _open_inotify()
+    mode = "inotify" if inotify else f"Polling alle {WATCH_POLL_INTERVAL}s"
+    print(f"👀 WATCH aktiv ({mode}) auf {STEPS_DIR} – Beenden mit Strg+C")
+    log(f"[WATCH] gestartet ({mode})")
+    try:
+        if inotify:
+            _watch_inotify(*inotify, jobs)
+        else:
+            _watch_polling(jobs)
+    except KeyboardInterrupt:
+        print("\n👋 WATCH beendet")
+        log("[WATCH] beendet")
+    finally:
+        if inotify:
+            os.close(inotify[1])
 
 # =====================================================================
 # Hilfsfunktionen
@@ -437,19 +2259,132 @@ def normalize_title(title: str) -> str:
     title = re.sub(r"-+", "-", title)
     return title.strip("-")
 
-def get_next_step_number():
-    """Findet die höchste step_XX und gibt +1 zurück."""
-    if not os.path.exists(STEPS_DIR):
-        return "01"
-    max_step = 0
-    for folder in os.listdir(STEPS_DIR):
-        if folder.startswith("step_"):
-            parts = folder.split("_")
-            if len(parts) > 1 and parts[1].isdigit():
-                num = int(parts[1])
-                if num > max_step:
-                    max_step = num
-    return f"{max_step + 1:02d}"
+def is_step_argument(arg, index=None):
+    """Ist das erste Init-Argument eine Step-Nummer statt der Anfang des Titels?
+
+    Ja bei genau STEP_WIDTH Ziffern ("05") oder bei einer längeren Nummer bis
+    zur nächsten freien ("120", sobald es so viele Steps gibt). "3 ways to sort"
+    oder "2048 game clone" bleiben so Titel; eindeutig geht es mit --step N.
+    """
+    if not arg.isdigit() or len(arg) < STEP_WIDTH:
+        return False
+    if len(arg) == STEP_WIDTH:
+        return True
+    if index is None:
+        index = load_step_index()
+    return int(arg) <= index["next"]
+
+def format_step_number(number):
+    """Step-Nummer mit STEP_WIDTH Stellen (ab 100 automatisch breiter)"""
+    return f"{int(number):0{STEP_WIDTH}d}"
+
+def parse_step_folder(name):
+    """step_05_smart-pointers → (5, "smart-pointers"); None bei fremden Namen"""
+    match = re.match(r"step_(\d+)(?:_(.*))?$", name)
+    if not match:
+        return None
+    return int(match.group(1)), match.group(2) or ""
+
+# =====================================================================
+# Step-Index (Nummer → Ordner, Titel, Anlagezeit)
+# =====================================================================
+
+def step_index_path():
+    """Pfad zum Step-Index unter ROOT_DIR"""
+    return os.path.join(ROOT_DIR, STEP_INDEX_FILE)
+
+def _empty_step_index():
+    return {"version": 1, "steps_mtime": None, "next": 1, "steps": {}}
+
+def _rebuild_step_index(index):
+    """Gleicht den Index mit STEPS_DIR ab (nur wenn sich der Ordner geändert hat)"""
+    known = {entry["folder"]: entry for entries in index["steps"].values() for entry in entries}
+    steps = {}
+    with os.scandir(STEPS_DIR) as it:
+        for dir_entry in it:
+            parsed = parse_step_folder(dir_entry.name)
+            if not parsed or not dir_entry.is_dir():
+                continue
+            number, slug = parsed
+            entry = known.get(dir_entry.name)
+            if entry is None:
+                created = datetime.fromtimestamp(dir_entry.stat().st_mtime).isoformat(timespec="seconds")
+                entry = {"folder": dir_entry.name, "title": slug.replace("-", " "), "created": created}
+            steps.setdefault(str(number), []).append(entry)
+    for entries in steps.values():
+        entries.sort(key=lambda entry: entry["folder"])
+    index["steps"] = steps
+    index["next"] = max((int(n) for n in steps), default=0) + 1
+
+def save_step_index(index):
+    """Schreibt den Step-Index nach ROOT_DIR"""
+    import json
+    write_text_atomic(step_index_path(), json.dumps(index, indent=1, sort_keys=True, ensure_ascii=False))
+
+def load_step_index():
+    """Lädt den Step-Index; liest STEPS_DIR nur neu ein, wenn dessen mtime abweicht"""
+    import json
+    try:
+        with open(step_index_path(), "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != 1:
+            index = _empty_step_index()
+    except (OSError, ValueError):
+        index = _empty_step_index()
+
+    steps_mtime = _mtime_ns(STEPS_DIR)
+    if steps_mtime is None:
+        return _empty_step_index()
+    if index["steps_mtime"] != steps_mtime:
+        _rebuild_step_index(index)
+        index["steps_mtime"] = steps_mtime
+        report_step_index_problems(index)
+        if os.path.isdir(ROOT_DIR):
+            save_step_index(index)
+    return index
+
+def register_step(index, number, folder, title, save=True):
+    """Trägt einen frisch angelegten Step ein und speichert den Index"""
+    entries = index["steps"].setdefault(str(number), [])
+    entries.append({"folder": folder, "title": title, "created": datetime.now().isoformat(timespec="seconds")})
+    index["next"] = max(index["next"], number + 1)
+    index["steps_mtime"] = _mtime_ns(STEPS_DIR)
+    if save:
+        save_step_index(index)
+
+def check_step_index(index):
+    """Findet Lücken und doppelt vergebene Nummern → (gaps, duplicates)"""
+    numbers = sorted(int(n) for n in index["steps"])
+    present = set(numbers)
+    gaps = [n for n in range(1, numbers[-1]) if n not in present] if numbers else []
+    duplicates = {int(n): [e["folder"] for e in entries]
+                  for n, entries in index["steps"].items() if len(entries) > 1}
+    return gaps, duplicates
+
+def report_step_index_problems(index):
+    """Meldet Lücken und Duplikate auf der Konsole und im Log"""
+    gaps, duplicates = check_step_index(index)
+    if gaps:
+        # Zusammenhängende Lücken als Bereich: 03-04, 07-119
+        ranges = []
+        for n in gaps:
+            if ranges and ranges[-1][1] == n - 1:
+                ranges[-1][1] = n
+            else:
+                ranges.append([n, n])
+        numbers = ", ".join(format_step_number(a) if a == b else f"{format_step_number(a)}-{format_step_number(b)}"
+                            for a, b in ranges)
+        print(f"ℹ️  Lücken in der Step-Nummerierung: {numbers}")
+        log(f"[INDEX] Lücken: {numbers}")
+    for number, folders in sorted(duplicates.items()):
+        print(f"⚠️  Step {format_step_number(number)} ist mehrfach vergeben: {', '.join(folders)}")
+        log(f"[WARN] Step {format_step_number(number)} mehrfach vergeben: {', '.join(folders)}")
+
+def get_next_step_number(index=None):
+    """Nächste freie Step-Nummer (höchste + 1) aus dem Step-Index"""
+    if index is None:
+        index = load_step_index()
+    return format_step_number(index["next"])
 
 # =====================================================================
 # INIT: Neuen Step anlegen
@@ -461,26 +2396,59 @@ def ensure_gitignore():
     
     if not os.path.exists(gitignore_path):
         with open(gitignore_path, "w", encoding="utf-8") as f:
-            f.write(GITIGNORE_TEMPLATE)
+            f.write(GITIGNORE_TEMPLATE.format(state=GITIGNORE_STATE))
         log("[CREATE] .gitignore erstellt im Root")
         print("✅ .gitignore wurde im cpp_mastery/ Root erstellt")
+        return
 
-def init_step(step, title):
-    """Erstellt einen neuen Step-Ordner mit kompletter Struktur"""
+    # Ältere, vom Script erzeugte .gitignore um die Zustandsdateien ergänzen
+    with open(gitignore_path, "r", encoding="utf-8") as f:
+        content = f.read()
+    if "Auto-generated by cpp_learn.py" in content and GITIGNORE_STATE.splitlines()[0] not in content:
+        with open(gitignore_path, "a", encoding="utf-8") as f:
+            f.write(("" if content.endswith("\n") else "\n") + "\n" + GITIGNORE_STATE)
+        log("[UPDATE] .gitignore um Script-Zustandsdateien ergänzt")
+
+def init_step(step, title, index=None, quiet=False, presets=DEFAULT_PRESETS, pch=False, unity=False,
+              bench=False):
+    """Erstellt einen neuen Step-Ordner mit kompletter Struktur.
+
+    Mit übergebenem index (Bulk-Modus) wird der Step-Index nur im
+    Speicher ergänzt; der Aufrufer speichert ihn am Ende einmal.
+    presets: zusätzliche CMake-Presets neben "default" (siehe OPTIMIZED_PRESETS).
+    pch/unity: vorkompilierten Header bzw. Unity-Build in CMakeLists.txt eintragen.
+    bench: include/bench.hpp, bench/bench_main.cpp und ein Bench-Target anlegen.
+    Gibt True zurück, wenn der Step angelegt wurde (False: Ordner da / Nummer vergeben).
+    """
     
     # Stelle sicher, dass .gitignore existiert (einmalig)
-    ensure_gitignore()
+    if index is None:
+        ensure_gitignore()
     
     if not os.path.exists(STEPS_DIR):
         os.makedirs(STEPS_DIR)
         log(f"[CREATE] steps/ Ordner erstellt: {STEPS_DIR}")
 
+    step = format_step_number(step)
     title_norm = normalize_title(title)
     folder = os.path.join(STEPS_DIR, f"step_{step}_{title_norm}")
 
     if os.path.exists(folder):
         print(f"⚠️  Step {step} existiert bereits: {folder}")
-        return
+        return False
+
+    own_index = index is None
+    if own_index:
+        index = load_step_index()
+    taken = index["steps"].get(str(int(step)))
+    if taken:
+        print(f"❌ Step-Nummer {step} ist bereits vergeben: {', '.join(e['folder'] for e in taken)}")
+        print(f"   Nächste freie Nummer: {get_next_step_number(index)}")
+        log(f"[ERROR] Step {step} nicht angelegt, Nummer vergeben ({', '.join(e['folder'] for e in taken)})")
+        return False
+
+    if pch:
+        ensure_common_pch()
 
     # Ordnerstruktur erstellen
     os.makedirs(folder)
@@ -489,7 +2457,7 @@ def init_step(step, title):
     os.makedirs(os.path.join(folder, "build"), exist_ok=True)
     os.makedirs(os.path.join(folder, "screenshots"), exist_ok=True)
     
-    if PIL_AVAILABLE:
+    if pil_installed():
         os.makedirs(os.path.join(folder, "thumbnails"), exist_ok=True)
 
     # Optional: include/ Ordner
@@ -512,14 +2480,16 @@ def init_step(step, title):
         f.write(CMAKELISTS_TEMPLATE.format(
             step=step,
             title=title,
-            title_norm=title_norm
+            title_norm=title_norm,
+            build_speedup=render_speedup_block(pch, unity),
+            bench=render_bench_block(bench)
         ))
 
     # CMakePresets.json
     import json
     presets_file = os.path.join(folder, "CMakePresets.json")
     with open(presets_file, "w", encoding="utf-8") as f:
-        json.dump(get_cmake_presets(step, title_norm), f, indent=4)
+        json.dump(get_cmake_presets(step, title_norm, presets), f, indent=4)
 
     # .vscode/launch.json erzeugen
     vscode_dir = os.path.join(folder, ".vscode")
@@ -542,34 +2512,1197 @@ def init_step(step, title):
     with open(gitkeep, "w") as f:
         pass
 
+    if bench:
+        write_bench_files(folder, step, title)
+
+    register_step(index, int(step), f"step_{step}_{title_norm}", title, save=own_index)
+    if own_index:
+        update_superbuild(added=[f"step_{step}_{title_norm}"])
+    log(f"[INIT] Step erstellt: step_{step}_{title_norm}", step=f"step_{step}_{title_norm}")
+
+    if quiet:
+        return True
+
     print(f"✅ INIT abgeschlossen")
     print(f"📁 Ordner: step_{step}_{title_norm}/")
     print(f"📝 Bereit zum Coden in src/main.cpp")
     print(f"🔨 Build mit: F7 in VS Code oder 'cmake --preset default && cmake --build build'")
-    log(f"[INIT] Step erstellt: step_{step}_{title_norm}")
+    if bench:
+        print(f"⏱️  Benchmarks in bench/ → 'py cpp_learn_portfolio.py bench {step}'")
+    if presets:
+        print(f"⚡ Optimiert: {', '.join(presets)} → 'cmake --preset {presets[0]} && cmake --build --preset {presets[0]}'")
+    return True
+
+# =====================================================================
+# BUILD-SPEEDUP: vorkompilierter Header & Unity-Build (init und retrofit)
+# =====================================================================
+
+def ensure_common_pch():
+    """Legt cpp_mastery/common/pch.hpp (+ Stub-.cpp) an, falls noch nicht da"""
+    common = os.path.join(ROOT_DIR, "common")
+    os.makedirs(common, exist_ok=True)
+    for name, content in (("pch.hpp", PCH_HEADER_TEMPLATE), ("pch.cpp", PCH_SOURCE_TEMPLATE)):
+        path = os.path.join(common, name)
+        if not os.path.exists(path):
+            write_text_atomic(path, content)
+            log(f"[CREATE] common/{name} erstellt")
+
+def render_speedup_block(pch, unity):
+    """Markierter CMake-Block für PCH/Unity; leer, wenn beides aus ist"""
+    if not (pch or unity):
+        return ""
+    parts = [SPEEDUP_PCH] if pch else []
+    if unity:
+        parts.append(SPEEDUP_UNITY)
+    return "\n" + SPEEDUP_BEGIN + "\n" + "\n".join(parts) + SPEEDUP_END + "\n"
+
+def render_bench_block(bench):
+    """Markierter CMake-Block für das Bench-Target; leer ohne --bench"""
+    if not bench:
+        return ""
+    return "\n" + BENCH_BEGIN + "\n" + BENCH_CMAKE + BENCH_END + "\n"
+
+def write_bench_files(folder, step, title):
+    """Legt include/bench.hpp und bench/bench_main.cpp an (vorhandene bleiben)"""
+    files = (
+        (os.path.join(folder, "include", "bench.hpp"), BENCH_HEADER_TEMPLATE),
+        (os.path.join(folder, "bench", "bench_main.cpp"), BENCH_MAIN_TEMPLATE.format(step=step, title=title)),
+    )
+    for path, content in files:
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            write_text_atomic(path, content)
+
+def apply_cmake_block(content, block, begin=SPEEDUP_BEGIN, end=SPEEDUP_END):
+    """Ersetzt einen vorhandenen Block in CMakeLists.txt oder hängt ihn an"""
+    if begin in content and end in content:
+        pre, rest = content.split(begin, 1)
+        _, post = rest.split(end, 1)
+        content = pre.rstrip("\n") + "\n" + post.lstrip("\n")
+    if not block:
+        return content
+    return content.rstrip("\n") + "\n" + block
+
+def retrofit_steps(selection=(), pch=False, unity=False, bench=False):
+    """Trägt PCH/Unity bzw. das Bench-Target nachträglich in bestehende Steps ein.
+
+    --pch/--unity ersetzen den build-speedup-Block, --bench ergänzt den
+    Bench-Block und legt fehlende Harness-Dateien an.
+    """
+    if not (pch or unity or bench):
+        print("ℹ️  retrofit braucht --pch, --unity und/oder --bench")
+        return False
+    if not os.path.exists(STEPS_DIR):
+        print(f"❌ Ordner nicht gefunden: {STEPS_DIR}")
+        return False
+
+    steps, missing = select_steps(selection)
+    for name in missing:
+        print(f"⚠️  Kein Step gefunden für: {name}")
+    if pch:
+        ensure_common_pch()
+
+    block = render_speedup_block(pch, unity)
+    changed = 0
+    for step in steps:
+        cmake = os.path.join(step["path"], "CMakeLists.txt")
+        if not step["cmake"]:
+            print(f"⚠️  {step['name']}: keine CMakeLists.txt")
+            continue
+        with open(cmake, "r", encoding="utf-8") as f:
+            content = f.read()
+        new_content = content
+        if pch or unity:
+            new_content = apply_cmake_block(new_content, block)
+        if bench:
+            parsed = parse_step_folder(step["name"])
+            write_bench_files(step["path"], format_step_number(parsed[0]) if parsed else step["name"],
+                              step["name"])
+            new_content = apply_cmake_block(new_content, render_bench_block(True), BENCH_BEGIN, BENCH_END)
+        if write_if_changed(cmake, new_content):
+            changed += 1
+            log(f"[RETROFIT] PCH={pch} Unity={unity} Bench={bench} in {step['name']}", step=step["name"])
+            print(f"🔧 {step['name']}")
+    update_superbuild()
+    print(f"✔ RETROFIT abgeschlossen: {changed} von {len(steps)} CMakeLists.txt geändert.")
+    return not missing
+
+# =====================================================================
+# BULK-INIT: viele Steps aus einer Manifest-Datei
+# =====================================================================
+
+def read_bulk_manifest(path):
+    """Liest Titel (optional mit Nummer) aus .csv, .json oder Text.
+
+    • Text: eine Zeile pro Step, "05 Smart Pointers" oder nur "Smart Pointers";
+      Leerzeilen und #-Kommentare werden ignoriert
+    • CSV:  Spalten number,title (Kopfzeile optional) oder nur title
+    • JSON: Liste aus Strings oder Objekten {"number": 5, "title": "..."}
+    Gibt [(nummer oder None, titel), ...] zurück.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    entries = []
+
+    if ext == ".json":
+        import json
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            raise ValueError("JSON-Manifest muss eine Liste sein")
+        for item in data:
+            if isinstance(item, str):
+                entries.append((None, item))
+            else:
+                number = item.get("number")
+                entries.append((int(number) if number not in (None, "") else None, str(item.get("title", ""))))
+    elif ext == ".csv":
+        import csv
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            for row in csv.reader(f):
+                row = [cell.strip() for cell in row]
+                if not any(row) or row[0].startswith("#"):
+                    continue
+                if len(row) == 1:
+                    entries.append((None, row[0]))
+                elif row[0].isdigit():
+                    entries.append((int(row[0]), row[1]))
+                elif row[0] == "":
+                    entries.append((None, row[1]))
+                elif row[0].lower() == "number":
+                    continue    # Kopfzeile
+                else:
+                    entries.append((None, ",".join(row)))
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                first, _, rest = line.partition(" ")
+                if first.isdigit() and rest.strip():
+                    entries.append((int(first), rest.strip()))
+                else:
+                    entries.append((None, line))
+    return entries
+
+def plan_bulk(entries, index):
+    """Vergibt Nummern und sammelt alle Konflikte, bevor irgendetwas angelegt wird.
+
+    Gibt (plan [(step, titel)], konflikte [text]) zurück.
+    """
+    conflicts = []
+    explicit = {}
+    for line, (number, title) in enumerate(entries, 1):
+        if not normalize_title(title):
+            conflicts.append(f"Eintrag {line}: leerer oder ungültiger Titel {title!r}")
+        if number is None:
+            continue
+        if number in explicit:
+            conflicts.append(f"Eintrag {line}: Nummer {format_step_number(number)} doppelt im Manifest "
+                             f"(auch Eintrag {explicit[number]})")
+        else:
+            explicit[number] = line
+        taken = index["steps"].get(str(number))
+        if taken:
+            conflicts.append(f"Eintrag {line}: Nummer {format_step_number(number)} schon vergeben "
+                             f"({', '.join(e['folder'] for e in taken)})")
+
+    # Automatische Nummern ab "next", explizite Nummern dabei überspringen
+    plan = []
+    next_number = index["next"]
+    for number, title in entries:
+        if number is None:
+            while next_number in explicit or str(next_number) in index["steps"]:
+                next_number += 1
+            number = next_number
+            next_number += 1
+        step = format_step_number(number)
+        folder = f"step_{step}_{normalize_title(title)}"
+        if os.path.exists(os.path.join(STEPS_DIR, folder)):
+            conflicts.append(f"Ordner existiert bereits: {folder}")
+        plan.append((step, title))
+    return plan, conflicts
+
+def init_bulk(path, presets=DEFAULT_PRESETS, pch=False, unity=False, bench=False):
+    """Legt alle Steps aus einer Manifest-Datei in einem Prozess an"""
+    if not os.path.exists(path):
+        print(f"❌ Manifest nicht gefunden: {path}")
+        return False
+
+    try:
+        entries = read_bulk_manifest(path)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"❌ Manifest unlesbar: {path} → {e}")
+        log(f"[ERROR] Bulk-Manifest unlesbar: {path} → {e}")
+        return False
+    if not entries:
+        print(f"ℹ️  Manifest enthält keine Steps: {path}")
+        return True
+
+    index = load_step_index()
+    plan, conflicts = plan_bulk(entries, index)
+    if conflicts:
+        print(f"❌ {len(conflicts)} Konflikt(e) – es wurde nichts angelegt:")
+        for conflict in conflicts:
+            print(f"   • {conflict}")
+            log(f"[ERROR] Bulk: {conflict}")
+        return False
+
+    # Einmalige Vorarbeiten für alle Steps
+    ensure_gitignore()
+    if not os.path.exists(STEPS_DIR):
+        os.makedirs(STEPS_DIR)
+        log(f"[CREATE] steps/ Ordner erstellt: {STEPS_DIR}")
+
+    for step, title in plan:
+        init_step(step, title, index=index, quiet=True, presets=presets, pch=pch, unity=unity,
+                  bench=bench)
+        print(f"📁 step_{step}_{normalize_title(title)}/")
+
+    index["steps_mtime"] = _mtime_ns(STEPS_DIR)
+    save_step_index(index)
+    update_superbuild(added=[f"step_{step}_{normalize_title(title)}" for step, title in plan])
+    print(f"✅ BULK-INIT abgeschlossen: {len(plan)} Steps angelegt")
+    log(f"[INIT] Bulk: {len(plan)} Steps aus {path}")
+    return True
+
+# =====================================================================
+# SUPERBUILD: cpp_mastery/CMakeLists.txt über alle Steps
+# =====================================================================
+
+# Ein configure für alle Steps: ein Build-Graph, ein Compiler-Check.
+# Die Datei wird nur geschrieben, wenn sich die Step-Liste geändert hat,
+# und nie, wenn dort eine eigene (nicht generierte) CMakeLists.txt liegt.
+
+def render_superbuild(folders):
+    """Root-CMakeLists.txt mit add_subdirectory() je Step-Ordner"""
+    has_pch = os.path.exists(os.path.join(ROOT_DIR, "common", "pch.hpp"))
+    return SUPERBUILD_TEMPLATE.format(
+        marker=SUPERBUILD_MARKER,
+        pch=SUPERBUILD_PCH if has_pch else "",
+        subdirectories="\n".join(f"add_subdirectory(steps/{folder})" for folder in sorted(folders)),
+    )
+
+SUPERBUILD_PRESETS_VENDOR = "cpp_learn_portfolio"
+
+def superbuild_presets_owned(path, presets):
+    """Gehört die Root-CMakePresets.json dem Script?
+
+    Ja, wenn sie fehlt, unseren vendor-Eintrag trägt oder exakt der früher
+    ohne Markierung erzeugte Inhalt ist (presets = aktuelle Vorlage).
+    """
+    import json
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            existing = json.load(f)
+    except FileNotFoundError:
+        return True
+    except (OSError, ValueError):
+        return False
+    if not isinstance(existing, dict):
+        return False
+    return SUPERBUILD_PRESETS_VENDOR in existing.get("vendor", {}) or existing == presets
+
+SUPERBUILD_SUBDIRECTORY = re.compile(r"^add_subdirectory\(steps/([^)]+)\)$", re.MULTILINE)
+
+def superbuild_folders():
+    """Step-Ordner mit CMakeLists.txt – ein scandir über STEPS_DIR, ohne die Steps selbst zu lesen"""
+    with os.scandir(STEPS_DIR) as it:
+        return [entry.name for entry in it
+                if entry.name.startswith("step_") and entry.is_dir()
+                and os.path.exists(os.path.join(entry.path, "CMakeLists.txt"))]
+
+def update_superbuild(steps=None, added=None):
+    """Hält Root-CMakeLists.txt und Root-CMakePresets.json synchron.
+
+    steps: bereits gescannte Steps (update_all). added: frisch angelegte
+    Step-Ordner (init) – werden an die vorhandene Liste angehängt, ohne
+    STEPS_DIR zu lesen. Sonst ein scandir über STEPS_DIR.
+    Gibt True zurück, wenn etwas geschrieben wurde.
+    """
+    import json
+    if not os.path.isdir(STEPS_DIR):
+        return False
+    cmake = os.path.join(ROOT_DIR, "CMakeLists.txt")
+    content = None
+    if os.path.exists(cmake):
+        with open(cmake, "r", encoding="utf-8") as f:
+            content = f.read()
+        if SUPERBUILD_MARKER not in content:
+            log(f"[SKIP] Eigene CMakeLists.txt im Root, Superbuild nicht geschrieben: {cmake}")
+            return False
+
+    if steps is not None:
+        folders = [step["name"] for step in steps if step["cmake"]]
+    elif added is not None and content is not None:
+        folders = set(SUPERBUILD_SUBDIRECTORY.findall(content)) | set(added)
+    else:
+        folders = superbuild_folders()
+    changed = write_if_changed(cmake, render_superbuild(folders))
+
+    # Root-CMakePresets.json nur schreiben, wenn sie fehlt oder von uns stammt
+    presets_path = os.path.join(ROOT_DIR, "CMakePresets.json")
+    presets = get_cmake_presets("all", "cpp_mastery")
+    if superbuild_presets_owned(presets_path, presets):
+        presets["vendor"] = {SUPERBUILD_PRESETS_VENDOR: {"generated": True}}
+        changed = write_if_changed(presets_path, json.dumps(presets, indent=4)) or changed
+    else:
+        log(f"[SKIP] Eigene CMakePresets.json im Root, nicht überschrieben: {presets_path}")
+    if changed:
+        log(f"[SUPERBUILD] Root-CMakeLists.txt aktualisiert ({len(folders)} Steps)")
+    return changed
+
+# =====================================================================
+# BUILD: alle (oder ausgewählte) Steps parallel bauen
+# =====================================================================
+
+def build_cache_path():
+    """Pfad zum Build-Cache unter ROOT_DIR"""
+    return os.path.join(ROOT_DIR, BUILD_CACHE_FILE)
+
+def load_build_cache():
+    """Ordner → {hash, built, seconds} der letzten erfolgreichen Builds"""
+    import json
+    try:
+        with open(build_cache_path(), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_build_cache(cache):
+    """Schreibt den Build-Cache nach ROOT_DIR"""
+    import json
+    write_text_atomic(build_cache_path(), json.dumps(cache, indent=1, sort_keys=True))
+
+def build_generator():
+    """Ninja wenn vorhanden, unter Windows sonst MinGW Makefiles, sonst CMake-Standard"""
+    import shutil
+    if shutil.which("ninja"):
+        return "Ninja"
+    if os.name == "nt":
+        return "MinGW Makefiles"
+    return None
+
+def build_settings():
+    """Einstellungen, die ins Build-Ergebnis eingehen (Teil des Hashes)"""
+    return {"cxx": CXX_COMPILER, "generator": build_generator(), "type": BUILD_TYPE}
+
+def source_hash(folder_path, settings):
+    """SHA1 über src/, include/, bench/, CMakeLists.txt, *.cmake und die Build-Einstellungen"""
+    import hashlib
+    import json
+    h = hashlib.sha1(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    files = []
+    for name in os.listdir(folder_path):
+        if name == "CMakeLists.txt" or name.endswith(".cmake"):
+            files.append(name)
+    for sub in ("src", "include", "bench"):
+        for dirpath, dirnames, filenames in os.walk(os.path.join(folder_path, sub)):
+            dirnames.sort()
+            for name in filenames:
+                files.append(os.path.relpath(os.path.join(dirpath, name), folder_path))
+    for rel in sorted(files):
+        h.update(rel.replace(os.sep, "/").encode("utf-8") + b"\0")
+        h.update(file_sha1(os.path.join(folder_path, rel)).encode("ascii"))
+    # Gemeinsamer PCH-Header (--pch) gehört mit zu den Eingaben
+    pch_header = os.path.join(ROOT_DIR, "common", "pch.hpp")
+    if os.path.exists(pch_header):
+        h.update(file_sha1(pch_header).encode("ascii"))
+    return h.hexdigest()
+
+def select_steps(selection):
+    """Steps nach Nummer ("5", "05") oder Ordnername auswählen; leer = alle"""
+    steps = scan_steps()
+    if not selection:
+        return steps, []
+    chosen = []
+    matched = set()
+    for step in steps:
+        parsed = parse_step_folder(step["name"])
+        hits = {s for s in selection
+                if s == step["name"] or (s.isdigit() and parsed and int(s) == parsed[0])}
+        if hits:
+            chosen.append(step)
+            matched |= hits
+    missing = [s for s in selection if s not in matched]
+    return chosen, missing
+
+def build_step(step, settings, parallel=None, subdir=BUILD_SUBDIR, target=None):
+    """configure + build eines Steps → {status, seconds, phase, output}"""
+    import subprocess
+    folder_path = step["path"]
+    build_dir = os.path.join(folder_path, subdir)
+    configure = ["cmake", "-S", folder_path, "-B", build_dir, f"-DCMAKE_BUILD_TYPE={settings['type']}"]
+    if settings["generator"]:
+        configure += ["-G", settings["generator"]]
+    if settings["cxx"]:
+        configure.append(f"-DCMAKE_CXX_COMPILER={settings['cxx']}")
+    build = ["cmake", "--build", build_dir]
+    if parallel:
+        build += ["--parallel", str(parallel)]
+    if target:
+        build += ["--target", target]
+
+    start = time.perf_counter()
+    for name, cmd in (("configure", configure), ("build", build)):
+        with phase(name, step["name"]):
+            try:
+                result = subprocess.run(cmd, capture_output=True, text=True)
+            except OSError as e:
+                return {"status": "failed", "phase": name, "output": str(e),
+                        "seconds": time.perf_counter() - start}
+        if result.returncode != 0:
+            return {"status": "failed", "phase": name, "output": result.stdout + result.stderr,
+                    "seconds": time.perf_counter() - start}
+    return {"status": "built", "phase": None, "output": "", "seconds": time.perf_counter() - start}
+
+def print_build_summary(results):
+    """Tabelle: Step, Status, Dauer – Fehler mit den letzten Ausgabezeilen"""
+    labels = {"built": "✅ gebaut", "cached": "⏭️  unverändert", "failed": "❌ Fehler"}
+    width = max(len(name) for name in results)
+    print()
+    print(f"{'Step':<{width}}  {'Status':<16}  Dauer")
+    print("-" * (width + 26))
+    for name, result in sorted(results.items()):
+        status = labels[result["status"]]
+        if result["phase"]:
+            status += f" ({result['phase']})"
+        seconds = f"{result['seconds']:.1f}s" if result["status"] != "cached" else "–"
+        print(f"{name:<{width}}  {status:<16}  {seconds}")
+    for name, result in sorted(results.items()):
+        if result["status"] == "failed":
+            print(f"\n❌ {name} ({result['phase']}):")
+            for line in result["output"].strip().splitlines()[-15:]:
+                print(f"   {line}")
+
+def build_superbuild(jobs=None):
+    """Ein configure + build über das Root-Projekt (alle Steps in einem Graph)"""
+    import shutil
+    if not shutil.which("cmake"):
+        print("❌ cmake nicht gefunden (PATH prüfen)")
+        log("[ERROR] build: cmake nicht gefunden")
+        return False
+    update_superbuild()
+    if not os.path.exists(os.path.join(ROOT_DIR, "CMakeLists.txt")):
+        print(f"❌ Keine CMakeLists.txt in {ROOT_DIR}")
+        return False
+
+    settings = build_settings()
+    print(f"🔨 Superbuild über alle Steps ({jobs or default_jobs()} parallel, "
+          f"Compiler: {settings['cxx'] or 'Standard'})")
+    result = build_step({"name": "superbuild", "path": ROOT_DIR}, settings, parallel=jobs or default_jobs())
+    if result["status"] == "built":
+        log(f"[BUILD] Superbuild in {result['seconds']:.1f}s")
+    else:
+        log(f"[ERROR] Superbuild fehlgeschlagen ({result['phase']})")
+    print_build_summary({"superbuild": result})
+    return result["status"] == "built"
+
+def build_steps(selection=(), jobs=None, force=False):
+    """Baut die ausgewählten Steps parallel; überspringt unveränderte.
+
+    Gibt True zurück, wenn kein Build fehlgeschlagen ist.
+    """
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not shutil.which("cmake"):
+        print("❌ cmake nicht gefunden (PATH prüfen)")
+        log("[ERROR] build: cmake nicht gefunden")
+        return False
+    if not os.path.exists(STEPS_DIR):
+        print(f"❌ Ordner nicht gefunden: {STEPS_DIR}")
+        return False
+
+    steps, missing = select_steps(selection)
+    for name in missing:
+        print(f"⚠️  Kein Step gefunden für: {name}")
+    if not steps:
+        print("ℹ️  Keine Steps zu bauen.")
+        return not missing
+
+    settings = build_settings()
+    cache = load_build_cache()
+    results = {}
+    todo = []
+    for step in steps:
+        digest = source_hash(step["path"], settings)
+        built_before = os.path.exists(os.path.join(step["path"], BUILD_SUBDIR, "CMakeCache.txt"))
+        if not force and built_before and cache.get(step["name"], {}).get("hash") == digest:
+            results[step["name"]] = {"status": "cached", "phase": None, "output": "", "seconds": 0.0}
+        else:
+            todo.append((step, digest))
+
+    print(f"🔨 Baue {len(todo)} von {len(steps)} Steps "
+          f"({jobs or default_jobs()} parallel, Compiler: {settings['cxx'] or 'Standard'})")
+    with ThreadPoolExecutor(max_workers=jobs or default_jobs()) as pool:
+        futures = {pool.submit(build_step, step, settings): (step, digest) for step, digest in todo}
+        for future, (step, digest) in futures.items():
+            result = future.result()
+            results[step["name"]] = result
+            if result["status"] == "built":
+                cache[step["name"]] = {"hash": digest, "seconds": round(result["seconds"], 2),
+                                       "built": datetime.now().isoformat(timespec="seconds")}
+                log(f"[BUILD] {step['name']} gebaut in {result['seconds']:.1f}s", step=step["name"])
+            else:
+                cache.pop(step["name"], None)
+                log(f"[ERROR] Build fehlgeschlagen ({result['phase']}): {step['name']}", step=step["name"])
+
+    if todo:
+        save_build_cache(cache)
+    print_build_summary(results)
+    failed = sum(1 for r in results.values() if r["status"] == "failed")
+    built = sum(1 for r in results.values() if r["status"] == "built")
+    print(f"\n{'❌' if failed else '✔'} BUILD abgeschlossen: {built} gebaut, "
+          f"{len(results) - built - failed} unverändert, {failed} fehlgeschlagen.")
+    return failed == 0 and not missing
+
+# =====================================================================
+# BENCH: Bench-Targets bauen (Release), nacheinander laufen lassen, vergleichen
+# =====================================================================
+
+def bench_binary(step):
+    """Pfad zum Bench-Executable eines Steps (Target ${PROJECT_NAME}_bench)"""
+    exe = f"{step['name']}_bench" + (".exe" if os.name == "nt" else "")
+    return os.path.join(step["path"], BENCH_SUBDIR, exe)
+
+def run_bench_binary(step):
+    """Startet ein Bench-Binary → ({Name: Messwerte}, Fehlertext oder None)"""
+    import json
+    import subprocess
+    try:
+        out = subprocess.run([bench_binary(step)], capture_output=True, text=True,
+                             cwd=step["path"], timeout=BENCH_TIMEOUT)
+    except (OSError, subprocess.SubprocessError) as e:
+        return {}, str(e)
+    results = {}
+    for line in out.stdout.splitlines():
+        line = line.strip()
+        if not line.startswith("{"):
+            continue
+        try:
+            entry = json.loads(line)
+            results[entry.pop("name")] = entry
+        except (ValueError, KeyError):
+            continue
+    if out.returncode != 0:
+        return results, f"Exit-Code {out.returncode}: {out.stderr.strip()[-500:]}"
+    return results, None
+
+def format_ns(ns):
+    """Nanosekunden lesbar: 850 ns, 12.3 µs, 4.56 ms"""
+    if ns < 1e3:
+        return f"{ns:.1f} ns"
+    if ns < 1e6:
+        return f"{ns / 1e3:.2f} µs"
+    if ns < 1e9:
+        return f"{ns / 1e6:.2f} ms"
+    return f"{ns / 1e9:.2f} s"
+
+def compare_bench(results, previous):
+    """Vergleicht Mediane mit dem letzten Lauf → [(Step, Name, jetzt, vorher, Änderung)]"""
+    rows = []
+    for folder in sorted(results):
+        for name, entry in sorted(results[folder].items()):
+            before = previous.get(folder, {}).get(name)
+            old = before["median_ns"] if before else None
+            change = (entry["median_ns"] - old) / old if old else None
+            rows.append((folder, name, entry, old, change))
+    return rows
+
+def render_bench_report(rows, date, previous_date):
+    """BENCH.md: Tabelle aller Benchmarks mit Vergleich zum vorherigen Lauf"""
+    md = [
+        "# ⏱️ C++ Mastery – Benchmarks",
+        "",
+        f"Lauf: {date}" + (f" · verglichen mit {previous_date}" if previous_date else ""),
+        "",
+        "| Step | Benchmark | Median | Min | Vorher | Δ |",
+        "|------|-----------|-------:|----:|-------:|--:|",
+    ]
+    for folder, name, entry, old, change in rows:
+        delta = "–"
+        if change is not None:
+            flag = " ⚠️" if change > BENCH_THRESHOLD else (" 🚀" if change < -BENCH_THRESHOLD else "")
+            delta = f"{change:+.1%}{flag}"
+        md.append(f"| {folder} | {name} | {format_ns(entry['median_ns'])} | {format_ns(entry['min_ns'])} | "
+                  f"{format_ns(old) if old else '–'} | {delta} |")
+    md.append("")
+    return "\n".join(md)
+
+def bench_steps(selection=(), jobs=None):
+    """Baut alle Bench-Targets parallel, misst nacheinander und meldet Regressionen.
+
+    Gibt False zurück bei Build-/Laufzeitfehlern oder Regressionen über
+    BENCH_THRESHOLD gegenüber dem gespeicherten letzten Lauf.
+    """
+    import json
+    import shutil
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not shutil.which("cmake"):
+        print("❌ cmake nicht gefunden (PATH prüfen)")
+        log("[ERROR] bench: cmake nicht gefunden")
+        return False
+    if not os.path.exists(STEPS_DIR):
+        print(f"❌ Ordner nicht gefunden: {STEPS_DIR}")
+        return False
+
+    steps, missing = select_steps(selection)
+    for name in missing:
+        print(f"⚠️  Kein Step gefunden für: {name}")
+    steps = [step for step in steps if os.path.isdir(os.path.join(step["path"], "bench"))]
+    if not steps:
+        print("ℹ️  Keine Steps mit bench/ gefunden (anlegen mit --bench oder 'retrofit --bench').")
+        return not missing
+
+    # Bauen darf parallel laufen, Messen nicht (sonst stören sich die Läufe)
+    settings = dict(build_settings(), type="Release")
+    print(f"🔨 Baue {len(steps)} Bench-Targets (Release, {jobs or default_jobs()} parallel)")
+    with ThreadPoolExecutor(max_workers=jobs or default_jobs()) as pool:
+        builds = list(pool.map(lambda step: build_step(step, settings, subdir=BENCH_SUBDIR,
+                                                       target=f"{step['name']}_bench"), steps))
+
+    failures = {}
+    results = {}
+    for step, build in zip(steps, builds):
+        if build["status"] != "built":
+            failures[step["name"]] = build
+            log(f"[ERROR] Bench-Build fehlgeschlagen ({build['phase']}): {step['name']}", step=step["name"])
+            continue
+        print(f"⏱️  {step['name']}")
+        with phase("bench", step["name"]):
+            entries, error = run_bench_binary(step)
+        if error:
+            failures[step["name"]] = {"status": "failed", "phase": "run", "output": error, "seconds": 0.0}
+            log(f"[ERROR] Bench fehlgeschlagen: {step['name']} → {error}", step=step["name"])
+        if entries:
+            results[step["name"]] = entries
+
+    results_path = os.path.join(ROOT_DIR, BENCH_RESULTS_FILE)
+    try:
+        with open(results_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+    except (OSError, ValueError):
+        stored = {}
+    previous = stored.get("results", {})
+    date = datetime.now().isoformat(timespec="seconds")
+    rows = compare_bench(results, previous)
+
+    # Nicht gemessene Steps behalten ihre alten Werte als Basis
+    merged = dict(previous, **results)
+    write_text_atomic(results_path, json.dumps({"date": date, "results": merged}, indent=1, sort_keys=True))
+    write_text_atomic(os.path.join(ROOT_DIR, BENCH_REPORT_FILE),
+                      render_bench_report(rows, date, stored.get("date")))
+
+    print()
+    for folder, name, entry, old, change in rows:
+        delta = f"{change:+.1%}" if change is not None else "neu"
+        print(f"   {folder:<30} {name:<34} {format_ns(entry['median_ns']):>10}  {delta}")
+    regressions = [(folder, name, change) for folder, name, _, _, change in rows
+                   if change is not None and change > BENCH_THRESHOLD]
+    for folder, name, change in regressions:
+        print(f"⚠️  Regression: {folder} / {name} {change:+.1%}")
+        log(f"[WARN] Bench-Regression {folder}/{name}: {change:+.1%}", step=folder)
+    if failures:
+        print_build_summary(failures)
+
+    print(f"\n{'❌' if failures or regressions else '✔'} BENCH abgeschlossen: "
+          f"{sum(len(r) for r in results.values())} Messungen in {len(results)} Steps, "
+          f"{len(regressions)} Regression(en), {len(failures)} Fehler → {BENCH_REPORT_FILE}")
+    return not (failures or regressions or missing)
+
+# =====================================================================
+# RUN: gebaute Step-Programme parallel ausführen, Ausgabe in die README
+# =====================================================================
+
+def find_step_binary(step):
+    """Neuestes Executable des Steps aus build/ (Preset default) oder build/cli"""
+    exe = step["name"] + (".exe" if os.name == "nt" else "")
+    candidates = []
+    for subdir in ("build", BUILD_SUBDIR):
+        path = os.path.join(step["path"], subdir, exe)
+        mtime = _mtime_ns(path)
+        if mtime is not None:
+            candidates.append((mtime, path))
+    return max(candidates)[1] if candidates else None
+
+def _as_text(output):
+    """subprocess-Ausgabe (bei Timeout evtl. bytes oder None) → str"""
+    if output is None:
+        return ""
+    if isinstance(output, bytes):
+        return output.decode("utf-8", errors="replace")
+    return output
+
+def run_step_binary(step, binary, timeout):
+    """Führt ein Step-Programm aus → {exit, timed_out, seconds, stdout, stderr}"""
+    import subprocess
+    start = time.perf_counter()
+    try:
+        out = subprocess.run([binary], cwd=step["path"], stdin=subprocess.DEVNULL, capture_output=True,
+                             text=True, errors="replace", timeout=timeout)
+        result = {"exit": out.returncode, "timed_out": False, "stdout": out.stdout, "stderr": out.stderr}
+    except subprocess.TimeoutExpired as e:
+        result = {"exit": None, "timed_out": True, "stdout": _as_text(e.stdout), "stderr": _as_text(e.stderr)}
+    except OSError as e:
+        result = {"exit": None, "timed_out": False, "stdout": "", "stderr": str(e)}
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    result["date"] = datetime.now().isoformat(timespec="seconds")
+    return result
+
+def render_run_block(result):
+    """README-Abschnitt mit Kopf (Zeit, Exit-Code, Dauer) und den ersten Ausgabezeilen"""
+    if result["timed_out"]:
+        status = "⏱️ Timeout"
+    elif result["exit"] == 0:
+        status = "✅ Exit 0"
+    else:
+        status = f"❌ Exit {result['exit']}"
+    lines = (result["stdout"] + result["stderr"]).rstrip().splitlines()
+    snippet = lines[:RUN_SNIPPET_LINES]
+    if len(lines) > RUN_SNIPPET_LINES:
+        snippet.append(f"… ({len(lines) - RUN_SNIPPET_LINES} weitere Zeilen)")
+    return "\n".join([
+        RUN_BEGIN,
+        "## ▶️ Letzte Ausgabe",
+        "",
+        f"{result['date'].replace('T', ' ')} · {status} · {result['seconds']:.2f} s",
+        "",
+        "```text",
+        *snippet,
+        "```",
+        RUN_END,
+    ]) + "\n\n"
+
+def splice_run_output(readme, block):
+    """Setzt den Ausgabe-Block vor "## 📸 Screenshots" (ersetzt einen alten).
+
+    Gibt True zurück, wenn die README geschrieben wurde.
+    """
+    with open(readme, "r", encoding="utf-8") as f:
+        content = f.read()
+    new_content = content
+    if RUN_BEGIN in new_content and RUN_END in new_content:
+        pre, rest = new_content.split(RUN_BEGIN, 1)
+        _, post = rest.split(RUN_END, 1)
+        new_content = pre + post.lstrip("\n")
+    if "## 📸 Screenshots" in new_content:
+        pre, post = new_content.split("## 📸 Screenshots", 1)
+        new_content = pre + block + "## 📸 Screenshots" + post
+    else:
+        new_content = new_content.rstrip("\n") + "\n\n" + block
+    if new_content == content:
+        return False
+    write_text_atomic(readme, new_content)
+    return True
+
+def run_steps(selection=(), jobs=None, force=False, timeout=None):
+    """Startet die gebauten Programme aller (ausgewählten) Steps parallel.
+
+    Ergebnisse werden nach Binary-Hash in cpp_mastery/.run_cache.json
+    gemerkt; unveränderte Binaries laufen nur mit force erneut. Gibt False
+    zurück, wenn ein Programm fehlschlug oder in den Timeout lief.
+    """
+    import json
+    from concurrent.futures import ThreadPoolExecutor
+
+    if not os.path.exists(STEPS_DIR):
+        print(f"❌ Ordner nicht gefunden: {STEPS_DIR}")
+        return False
+    steps, missing = select_steps(selection)
+    for name in missing:
+        print(f"⚠️  Kein Step gefunden für: {name}")
+
+    cache_path = os.path.join(ROOT_DIR, RUN_CACHE_FILE)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    results = {}
+    todo = []
+    for step in steps:
+        binary = find_step_binary(step)
+        if binary is None:
+            results[step["name"]] = None
+            continue
+        digest = file_sha1(binary)
+        cached = cache.get(step["name"])
+        if not force and cached and cached["sha1"] == digest:
+            results[step["name"]] = dict(cached, cached=True)
+        else:
+            todo.append((step, binary, digest))
+
+    workers = jobs or default_jobs()
+    print(f"▶️  Starte {len(todo)} von {len(steps)} Programmen ({workers} parallel, "
+          f"Timeout {timeout or RUN_TIMEOUT}s)")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        runs = list(pool.map(lambda job: run_step_binary(job[0], job[1], timeout or RUN_TIMEOUT), todo))
+
+    written = 0
+    for (step, binary, digest), result in zip(todo, runs):
+        result["sha1"] = digest
+        result["binary"] = os.path.relpath(binary, step["path"])
+        cache[step["name"]] = result
+        results[step["name"]] = result
+        if step["readme"] is not None and splice_run_output(os.path.join(step["path"], "README.md"),
+                                                            render_run_block(result)):
+            written += 1
+        ok = result["exit"] == 0 and not result["timed_out"]
+        log(f"[{'RUN' if ok else 'ERROR'}] {step['name']}: exit={result['exit']} "
+            f"timeout={result['timed_out']} {result['seconds']:.2f}s", step=step["name"])
+    if todo:
+        write_text_atomic(cache_path, json.dumps(cache, indent=1, sort_keys=True))
+
+    # Zusammenfassung
+    width = max((len(name) for name in results), default=4)
+    print()
+    print(f"{'Step':<{width}}  {'Status':<16}  Dauer")
+    print("-" * (width + 26))
+    failed = 0
+    for name, result in sorted(results.items()):
+        if result is None:
+            print(f"{name:<{width}}  {'– nicht gebaut':<16}  –")
+            continue
+        if result["timed_out"]:
+            status = "⏱️  Timeout"
+        elif result["exit"] == 0:
+            status = "✅ Exit 0"
+        else:
+            status = f"❌ Exit {result['exit']}"
+        if not (result["exit"] == 0 and not result["timed_out"]):
+            failed += 1
+        if result.get("cached"):
+            status += " (Cache)"
+        print(f"{name:<{width}}  {status:<16}  {result['seconds']:.2f}s")
+
+    print(f"\n{'❌' if failed else '✔'} RUN abgeschlossen: {len(todo)} ausgeführt, "
+          f"{failed} fehlgeschlagen, {written} READMEs aktualisiert.")
+    return failed == 0 and not missing
+
+# =====================================================================
+# OPTIMIZE: PNG-Screenshots verlustfrei neu komprimieren
+# =====================================================================
+
+# PNG-Metadaten, die ohne --strip erhalten bleiben
+_PNG_KEEP_INFO = ("dpi", "exif", "icc_profile", "transparency")
+
+def _png_color_chunks(info):
+    """gAMA/sRGB/cHRM aus img.info als (Chunk-Typ, Daten) – save() schreibt sie nicht selbst"""
+    import struct
+    chunks = []
+    if "gamma" in info:
+        chunks.append((b"gAMA", struct.pack(">I", round(info["gamma"] * 100000))))
+    if "srgb" in info:
+        chunks.append((b"sRGB", bytes([info["srgb"]])))
+    if "chromaticity" in info:
+        chunks.append((b"cHRM", struct.pack(">8I", *(round(v * 100000) for v in info["chromaticity"]))))
+    return chunks
+
+def _optimize_png(path, strip):
+    """Komprimiert eine PNG verlustfrei neu und ersetzt sie atomar (läuft im Worker).
+
+    Die neue Datei wird nur übernommen, wenn sie kleiner ist und exakt
+    dieselben Pixel enthält; die mtime bleibt erhalten (Galerie-Reihenfolge).
+    Animierte PNGs (APNG) bleiben unverändert.
+    Gibt (Größe vorher, Größe nachher, Fehlertext oder None) zurück.
+    """
+    import tempfile
+    import shutil
+    Image = pil_image()
+    st = os.stat(path)
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{name}.", suffix=".tmp", dir=directory)
+    os.close(fd)
+    try:
+        with Image.open(path) as img:
+            if getattr(img, "is_animated", False):
+                # APNG: nur das erste Bild würde gespeichert → Original behalten
+                os.remove(tmp_path)
+                return st.st_size, st.st_size, None
+            img.load()
+            params = {"optimize": True}
+            if not strip:
+                params.update({key: img.info[key] for key in _PNG_KEEP_INFO if key in img.info})
+                chunks = _png_color_chunks(img.info)
+                if chunks or getattr(img, "text", None):
+                    from PIL import PngImagePlugin
+                    info = PngImagePlugin.PngInfo()
+                    for chunk_type, data in chunks:
+                        info.add(chunk_type, data)
+                    for key, value in getattr(img, "text", {}).items():
+                        info.add_text(key, value)
+                    params["pnginfo"] = info
+            img.save(tmp_path, "PNG", **params)
+            with Image.open(tmp_path) as new:
+                lossless = new.mode == img.mode and new.size == img.size and new.tobytes() == img.tobytes()
+        new_size = os.path.getsize(tmp_path)
+        if not lossless or new_size >= st.st_size:
+            os.remove(tmp_path)
+            return st.st_size, st.st_size, None if lossless else "Pixel weichen ab – Original behalten"
+        shutil.copymode(path, tmp_path)
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_path, path)
+        return st.st_size, new_size, None
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return st.st_size, st.st_size, str(e)
+
+def _optimize_worker(job):
+    """Prozess-Pool-Einstieg: job = (Pfad, strip)"""
+    path, strip = job
+    return _optimize_png(path, strip)
+
+def optimize_screenshots(selection=(), jobs=None, strip=False):
+    """Komprimiert alle (noch nicht optimierten) PNG-Screenshots neu.
+
+    Bereits optimierte Dateien stehen mit Größe/mtime/sha1 in
+    cpp_mastery/.optimize_cache.json und werden übersprungen.
+    Der Thumbnail-Cache wird mitgezogen, damit die (pixelgleichen) Bilder
+    keine neuen Thumbnails auslösen.
+    """
+    import json
+    from concurrent.futures import ProcessPoolExecutor
+
+    if not require_pil():
+        return False
+    if not os.path.exists(STEPS_DIR):
+        print(f"❌ Ordner nicht gefunden: {STEPS_DIR}")
+        return False
+    steps, missing = select_steps(selection)
+    for name in missing:
+        print(f"⚠️  Kein Step gefunden für: {name}")
+
+    cache_path = os.path.join(ROOT_DIR, OPTIMIZE_CACHE_FILE)
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    todo = []
+    skipped = 0
+    for step in steps:
+        scan_step_images(step)
+        for fname, _, size in step["screenshots"]:
+            if not fname.lower().endswith(".png"):
+                continue
+            path = os.path.join(step["path"], "screenshots", fname)
+            key = f"{step['name']}/{fname}"
+            entry = cache.get(key)
+            if entry and entry["size"] == size and (entry["strip"] or not strip):
+                # mtime wie gehabt → ohne Lesen überspringen; sonst (z.B. frischer Clone) per Hash
+                if entry["mtime_ns"] == _mtime_ns(path) or entry["sha1"] == file_sha1(path):
+                    skipped += 1
+                    continue
+            todo.append((step, fname, path))
+
+    print(f"🗜️  Optimiere {len(todo)} PNGs ({skipped} schon optimiert, {'ohne' if strip else 'mit'} Metadaten)")
+    workers = min(jobs or default_jobs(), max(len(todo), 1))
+    job_args = [(path, strip) for _, _, path in todo]
+    with phase("optimize"):
+        if workers <= 1:
+            results = [_optimize_worker(job) for job in job_args]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(_optimize_worker, job_args))
+
+    before_total = after_total = 0
+    improved = failed = 0
+    changed = {}   # Step-Pfad → {Name: (neuer sha1, neue Größe)}
+    for (step, fname, path), (before, after, error) in zip(todo, results):
+        if error:
+            failed += 1
+            log(f"[ERROR] Optimieren fehlgeschlagen: {path} → {error}", step=step["name"])
+            continue
+        before_total += before
+        after_total += after
+        if after < before:
+            improved += 1
+            log(f"[OPTIMIZE] {step['name']}/{fname}: {before} → {after} Bytes", step=step["name"])
+        digest = file_sha1(path)
+        if after < before:
+            changed.setdefault(step["path"], {})[fname] = (digest, after)
+        cache[f"{step['name']}/{fname}"] = {"size": after, "mtime_ns": _mtime_ns(path), "sha1": digest,
+                                              "strip": strip}
+
+    # Thumbnail-Cache nachziehen: gleiche Pixel → gleiches Thumbnail
+    for step_path, files in changed.items():
+        thumbs = os.path.join(step_path, "thumbnails")
+        thumb_cache = load_thumb_cache(thumbs)
+        if not thumb_cache:
+            continue
+        for fname, (digest, size) in files.items():
+            if fname in thumb_cache:
+                thumb_cache[fname].update(sha1=digest, size=size)
+        save_thumb_cache(thumbs, thumb_cache)
+
+    if todo:
+        write_text_atomic(cache_path, json.dumps(cache, indent=1, sort_keys=True))
+    saved = before_total - after_total
+    print(f"{'❌' if failed else '✔'} OPTIMIZE abgeschlossen: {improved} PNGs verkleinert, "
+          f"{saved / 1024:.1f} KB gespart ({saved / before_total:.1%})" if before_total else
+          f"{'❌' if failed else '✔'} OPTIMIZE abgeschlossen: nichts zu tun")
+    if failed:
+        print(f"⚠️  {failed} Datei(en) fehlgeschlagen – siehe {LOGFILE}")
+    log(f"[DONE] Optimize: {improved} verkleinert, {saved} Bytes gespart, {failed} Fehler")
+    return failed == 0 and not missing
 
 # =====================================================================
 # MAIN
 # =====================================================================
 
+def split_options(args, value_options=()):
+    """Trennt --optionen von den übrigen Argumenten.
+
+    --name und --name=wert sind immer erlaubt; Optionen in value_options
+    nehmen zusätzlich das folgende Argument als Wert (--jobs 4).
+    """
+    options = {}
+    rest = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith("--") and len(arg) > 2:
+            name, sep, value = arg[2:].partition("=")
+            if sep:
+                options[name] = value
+            elif name in value_options and i + 1 < len(args):
+                options[name] = args[i + 1]
+                i += 1
+            else:
+                options[name] = True
+        else:
+            rest.append(arg)
+        i += 1
+    return options, rest
+
+# Bekannte --optionen; alles andere wird abgelehnt statt still als Flag (oder im Titel) zu landen
+VALUE_OPTIONS = {"jobs", "log-keep", "profile-json", "bulk", "cxx", "presets", "step", "timeout"}
+FLAG_OPTIONS = {"bench", "collapse", "dedup", "force", "full", "log-json", "pch", "profile", "sheets",
+                "split-pages", "strip", "superbuild", "unity", "watch", "webp"}
+
 if __name__ == "__main__":
     args = sys.argv[1:]
     
+    options, args = split_options(args, value_options=VALUE_OPTIONS)
+
+    unknown = sorted(set(options) - VALUE_OPTIONS - FLAG_OPTIONS)
+    if unknown:
+        print(f"❌ Unbekannte Option: {', '.join('--' + name for name in unknown)}")
+        print(f"   Erlaubt: {', '.join('--' + name for name in sorted(VALUE_OPTIONS | FLAG_OPTIONS))}")
+        sys.exit(2)
+
+    if options.get("profile") or options.get("profile-json"):
+        PROFILE = {"phases": {}, "steps": {}}
+
+    if options.get("webp"):
+        THUMB_WEBP = True
+    if options.get("split-pages"):
+        SPLIT_PAGES = True
+    if options.get("dedup"):
+        DEDUP = "global" if options["dedup"] == "global" else "step"
+    if options.get("collapse"):
+        DEDUP_COLLAPSE = True
+    if options.get("sheets"):
+        SHEETS = True
+    if "cxx" in options:
+        CXX_COMPILER = str(options["cxx"])
+
+    if options.get("log-json"):
+        LOG_FORMAT = "json"
+    if str(options.get("log-keep", "")).isdigit():
+        LOG_BACKUPS = int(options["log-keep"])
+
+    jobs = None
+    if "jobs" in options:
+        if not str(options["jobs"]).isdigit() or int(options["jobs"]) < 1:
+            print(f"❌ --jobs erwartet eine Zahl >= 1, nicht: {options['jobs']}")
+            sys.exit(2)
+        jobs = int(options["jobs"])
+
+    presets = DEFAULT_PRESETS
+    if "presets" in options:
+        try:
+            presets = parse_presets(options["presets"])
+        except ValueError as e:
+            print(f"❌ --presets: {e}")
+            sys.exit(2)
+
+    pch = bool(options.get("pch"))
+    unity = bool(options.get("unity"))
+    bench = bool(options.get("bench"))
+
+    # RETROFIT (PCH/Unity für bestehende Steps)
+    if args and args[0] == "retrofit":
+        sys.exit(0 if retrofit_steps(args[1:], pch=pch, unity=unity, bench=bench) else 1)
+
+    # BULK-INIT
+    if "bulk" in options:
+        sys.exit(0 if init_bulk(options["bulk"], presets, pch=pch, unity=unity, bench=bench) else 1)
+
+    # BUILD MODE
+    if args and args[0] == "build":
+        if options.get("superbuild"):
+            ok = build_superbuild(jobs=jobs)
+        else:
+            ok = build_steps(args[1:], jobs=jobs, force=bool(options.get("force")))
+        profile_report(options.get("profile-json"))
+        sys.exit(0 if ok else 1)
+
+    # BENCH MODE
+    if args and args[0] == "bench":
+        ok = bench_steps(args[1:], jobs=jobs)
+        profile_report(options.get("profile-json"))
+        sys.exit(0 if ok else 1)
+
+    # OPTIMIZE MODE
+    if args and args[0] == "optimize":
+        ok = optimize_screenshots(args[1:], jobs=jobs, strip=bool(options.get("strip")))
+        profile_report(options.get("profile-json"))
+        sys.exit(0 if ok else 1)
+
+    # RUN MODE
+    if args and args[0] == "run":
+        timeout = None
+        if "timeout" in options:
+            try:
+                timeout = float(options["timeout"])
+            except ValueError:
+                print(f"❌ --timeout erwartet Sekunden, nicht: {options['timeout']}")
+                sys.exit(2)
+        ok = run_steps(args[1:], jobs=jobs, force=bool(options.get("force")), timeout=timeout)
+        sys.exit(0 if ok else 1)
+
+    # WATCH MODE
+    if len(args) == 0 and options.get("watch"):
+        watch_steps(jobs=jobs)
+        sys.exit()
+
     # UPDATE MODE (keine Argumente)
     if len(args) == 0:
-        update_all()
+        update_all(full=bool(options.get("full")), jobs=jobs)
+        profile_report(options.get("profile-json"))
         sys.exit()
     
-    # Prüfe ob erstes Argument eine Step-Nummer ist (2 Ziffern)
-    first_is_step = len(args[0]) == 2 and args[0].isdigit()
-    
-    if first_is_step:
-        # Format: Step + Titel
-        step = args[0]
+    if "step" in options:
+        # Format: --step N + Titel (eindeutig, auch für Titel, die mit einer Zahl beginnen)
+        if not str(options["step"]).isdigit():
+            print(f"❌ --step erwartet eine Nummer, nicht: {options['step']}")
+            sys.exit(2)
+        step = format_step_number(options["step"])
+        title = " ".join(args)
+    elif is_step_argument(args[0]):
+        # Format: Step + Titel (wird auf STEP_WIDTH Stellen aufgefüllt)
+        step = format_step_number(args[0])
         title = " ".join(args[1:]) if len(args) > 1 else "untitled"
     else:
         # Format: Nur Titel (Auto-Step)
         step = get_next_step_number()
         title = " ".join(args)
     
-    init_step(step, title)
\ No newline at end of file
+    ok = init_step(step, title, presets=presets, pch=pch, unity=unity, bench=bench)
+    sys.exit(0 if ok else 1)
\ No newline at end of file